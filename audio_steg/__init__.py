@@ -3,15 +3,77 @@ Audio Steganography Library
 Hide and extract images in WAV audio files using LSB technique
 """
 
-from .core import hide_image, extract_image
-from .utils import resize_image_for_audio, get_audio_capacity, compare_images
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "Audio Steganography"
 __all__ = [
     "hide_image",
     "extract_image",
+    "hide_image_bytes",
+    "hide_images",
+    "list_payloads",
+    "extract_image_array",
+    "extract_image_bytes",
+    "extract_region",
+    "extract_preview",
     "resize_image_for_audio",
     "get_audio_capacity",
-    "compare_images"
+    "compare_images",
+    "batch_hide",
+    "batch_extract",
+    "hide_image_sharded",
+    "extract_image_sharded",
+    "scan_directory",
+    "enable_cache",
+    "disable_cache",
+    "OperationCancelled"
 ]
+
+# Public names and the submodules defining them. Submodules are imported on
+# first access, so e.g. checking capacity never loads Pillow or NumPy.
+_LAZY_ATTRIBUTES = {
+    "hide_image": "core",
+    "extract_image": "core",
+    "hide_image_bytes": "core",
+    "hide_images": "core",
+    "list_payloads": "core",
+    "extract_image_array": "core",
+    "extract_image_bytes": "core",
+    "extract_region": "core",
+    "extract_preview": "core",
+    "resize_image_for_audio": "utils",
+    "get_audio_capacity": "capacity",
+    "compare_images": "utils",
+    "batch_hide": "batch",
+    "batch_extract": "batch",
+    "hide_image_sharded": "shard",
+    "extract_image_sharded": "shard",
+    "scan_directory": "scan",
+    "enable_cache": "cache",
+    "disable_cache": "cache",
+    "OperationCancelled": "progress",
+}
+
+# Submodules, also imported on first access as ``audio_steg.<name>``
+_SUBMODULES = frozenset({
+    "aio", "batch", "cache", "capacity", "codecs", "compare", "core", "engine", "header", "metrics", "payload",
+    "progress", "riff", "scan", "server", "shard", "utils", "wavio",
+})
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _SUBMODULES)
@@ -0,0 +1,236 @@
+"""
+Asyncio API for event-loop services
+
+The coroutines here mirror the blocking functions of the package without
+holding up the event loop. Hide and extract jobs are CPU-bound and run in a
+process pool; header reads such as :func:`get_audio_capacity` only do
+blocking I/O and run in the loop's default thread pool. Jobs whose inputs
+cannot be sent to another process (open file objects, PIL images, progress
+callbacks or cancel tokens) run in the thread pool instead. At most
+``max_concurrency`` jobs are in flight per event loop; the rest wait their
+turn without blocking anything.
+
+Example:
+    from audio_steg import aio
+    
+    aio.configure(max_workers=4, max_concurrency=32)
+    result = await aio.hide_image("audio.wav", "secret.png", "stego.wav")
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+from . import capacity, core
+
+
+# Jobs in flight per event loop before callers start queueing
+DEFAULT_MAX_CONCURRENCY = 64
+
+# Argument types that can be handed to a worker process
+_PICKLABLE_TYPES = (str, bytes, bytearray, os.PathLike, type(None))
+
+_lock = threading.Lock()
+_executor = None
+_owns_executor = False
+_max_workers = None
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def configure(executor=None, max_workers=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Set up the pool CPU-bound jobs run in
+    
+    The previous pool is shut down if this module created it.
+    
+    Args:
+        executor (concurrent.futures.Executor, optional): Pool to run hide and
+            extract jobs in. By default a ``ProcessPoolExecutor`` is created
+            on first use
+        max_workers (int, optional): Size of the default process pool;
+            defaults to the CPU count
+        max_concurrency (int): Jobs in flight per event loop
+    """
+    global _executor, _owns_executor, _max_workers, _max_concurrency
+    
+    shutdown()
+    with _lock:
+        _executor = executor
+        _owns_executor = False
+        _max_workers = max_workers
+        _max_concurrency = max_concurrency
+        _semaphores.clear()
+
+
+def shutdown(wait=True):
+    """
+    Shut down the process pool if this module created it
+    
+    Args:
+        wait (bool): Wait for running jobs to finish
+    """
+    global _executor, _owns_executor
+    
+    with _lock:
+        executor, owned = _executor, _owns_executor
+        if owned:
+            _executor = None
+            _owns_executor = False
+    
+    if owned:
+        executor.shutdown(wait=wait)
+
+
+def _get_executor():
+    """Return the pool for CPU-bound jobs, creating the default one if needed"""
+    global _executor, _owns_executor
+    
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=_max_workers)
+            _owns_executor = True
+        return _executor
+
+
+def _semaphore():
+    """Return the concurrency limit of the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+        return semaphore
+
+
+async def _run_in_thread(func, *args, **kwargs):
+    """
+    Run a blocking call in the loop's default thread pool
+    
+    If the awaiting task is cancelled, a cancel token passed to ``func`` is
+    set so the call stops at its next chunk.
+    """
+    loop = asyncio.get_running_loop()
+    cancel = kwargs.get("cancel")
+    try:
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    except asyncio.CancelledError:
+        if cancel is not None:
+            cancel.set()
+        raise
+
+
+async def _run_job(func, *args, **kwargs):
+    """
+    Run a hide or extract job within the concurrency limit
+    
+    Jobs go to the process pool when their arguments can be pickled, and to
+    the thread pool otherwise. In the thread pool, a cancel token is created
+    if the caller did not pass one, so cancelling the awaiting task stops the
+    job between chunks; a job already running in a worker process finishes.
+    """
+    in_process = (
+        all(isinstance(value, _PICKLABLE_TYPES) for value in args)
+        and all(kwargs.get(key) is None for key in ("progress", "cancel", "metrics_callback"))
+    )
+    
+    async with _semaphore():
+        if in_process:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+        
+        if kwargs.get("cancel") is None:
+            kwargs["cancel"] = threading.Event()
+        return await _run_in_thread(func, *args, **kwargs)
+
+
+async def hide_image(wav_path, image_path, output_path, **options):
+    """
+    Hide an image inside a WAV audio file without blocking the event loop
+    
+    Args:
+        wav_path (str, bytes or file): Input WAV file
+        image_path (str, bytes, file or PIL.Image): Image to hide
+        output_path (str or file): Output WAV file
+        **options: Keyword arguments of :func:`audio_steg.hide_image`;
+            ``verbose`` defaults to False. ``progress`` and ``metrics_callback``
+            are called from a worker thread
+            
+    Returns:
+        dict: Information about the operation, as from
+        :func:`audio_steg.hide_image`
+    """
+    options.setdefault("verbose", False)
+    return await _run_job(core.hide_image, wav_path, image_path, output_path, **options)
+
+
+async def hide_image_bytes(wav, image, **options):
+    """
+    Hide an image in a WAV file held in memory without blocking the event loop
+    
+    Args:
+        wav (bytes, file or str): WAV file contents, a binary file object,
+            or a path
+        image (bytes, file, str or PIL.Image): Image to hide
+        **options: Keyword arguments of :func:`audio_steg.hide_image_bytes`
+        
+    Returns:
+        bytes: The output WAV file
+    """
+    return await _run_job(core.hide_image_bytes, wav, image, **options)
+
+
+async def extract_image(wav_path, output_image_path, **options):
+    """
+    Extract a hidden image from a WAV audio file without blocking the event loop
+    
+    Args:
+        wav_path (str, bytes or file): WAV file containing a hidden image
+        output_image_path (str): Path where the extracted image will be saved
+        **options: Keyword arguments of :func:`audio_steg.extract_image`;
+            ``verbose`` defaults to False
+            
+    Returns:
+        dict: Information about the extracted image, as from
+        :func:`audio_steg.extract_image`
+    """
+    options.setdefault("verbose", False)
+    return await _run_job(core.extract_image, wav_path, output_image_path, **options)
+
+
+async def extract_image_bytes(wav, format='PNG', **options):
+    """
+    Extract a hidden image as encoded bytes without blocking the event loop
+    
+    Args:
+        wav (bytes, file or str): WAV file contents, a binary file object,
+            or a path
+        format (str): Pillow format to encode the image with
+        **options: Keyword arguments of :func:`audio_steg.extract_image_bytes`
+        
+    Returns:
+        bytes: The encoded image
+    """
+    return await _run_job(core.extract_image_bytes, wav, format, **options)
+
+
+async def get_audio_capacity(wav_path, **options):
+    """
+    Report the capacity of a WAV file without blocking the event loop
+    
+    Only the header is read, so this runs in the thread pool.
+    
+    Args:
+        wav_path (str): Path to WAV file
+        **options: Keyword arguments of :func:`audio_steg.get_audio_capacity`,
+            such as ``bits_per_sample``
+            
+    Returns:
+        dict: Capacity information, as from :func:`audio_steg.get_audio_capacity`
+    """
+    async with _semaphore():
+        return await _run_in_thread(capacity.get_audio_capacity, wav_path, **options)
+
@@ -0,0 +1,225 @@
+"""
+Batch hide/extract jobs spread across a process pool
+"""
+
+import csv
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import hide_image, extract_image
+
+
+# Options a hide job may set, either for the whole batch or per manifest row
+HIDE_OPTIONS = ("auto_resize", "bits_per_sample", "compression", "chunk_size")
+
+# Columns each kind of job needs
+REQUIRED_FIELDS = {
+    "hide": ("audio", "image", "output"),
+    "extract": ("audio", "output"),
+}
+
+
+def load_manifest(manifest_path, kind):
+    """
+    Read batch jobs from a CSV or JSON Lines manifest
+    
+    CSV manifests need a header row. Hide jobs need ``audio``, ``image`` and
+    ``output`` columns, extract jobs ``audio`` and ``output``. Hide jobs may
+    also set ``auto_resize``, ``bits_per_sample``, ``compression`` or
+    ``chunk_size``. Relative paths are resolved against the manifest's
+    directory.
+    
+    Args:
+        manifest_path (str): Path to a ``.csv`` or ``.jsonl`` file
+        kind (str): ``"hide"`` or ``"extract"``
+        
+    Returns:
+        list: Job dicts
+        
+    Raises:
+        ValueError: If a row is missing a required field
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    
+    with open(manifest_path, newline='', encoding='utf-8') as f:
+        if manifest_path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    
+    jobs = []
+    for line_no, row in enumerate(rows, 1):
+        job = {key: value for key, value in row.items() if value not in (None, '')}
+        
+        for field in REQUIRED_FIELDS[kind]:
+            if field not in job:
+                raise ValueError(f"{manifest_path}: job {line_no} is missing '{field}'")
+            job[field] = os.path.join(base, job[field])
+        
+        # CSV values arrive as strings
+        if "bits_per_sample" in job:
+            job["bits_per_sample"] = int(job["bits_per_sample"])
+        if "chunk_size" in job:
+            job["chunk_size"] = int(job["chunk_size"])
+        if isinstance(job.get("auto_resize"), str):
+            job["auto_resize"] = job["auto_resize"].strip().lower() in ("1", "true", "yes")
+        
+        jobs.append(job)
+    
+    return jobs
+
+
+def _stem(path):
+    """File name of ``path`` without directory or extension"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def jobs_from_globs(kind, audio_glob, output_dir, image_glob=None, extension=".png"):
+    """
+    Build batch jobs from glob patterns
+    
+    For hide jobs, images are paired with carriers that have the same file
+    name stem; if the audio pattern matches a single file it is used as the
+    carrier for every image. Outputs are written to ``output_dir`` as
+    ``<image stem>.wav``. For extract jobs every matched WAV file is
+    extracted to ``<audio stem><extension>``.
+    
+    Args:
+        kind (str): ``"hide"`` or ``"extract"``
+        audio_glob (str): Pattern matching WAV files
+        output_dir (str): Directory for the outputs
+        image_glob (str, optional): Pattern matching images (hide only)
+        extension (str): Image file extension for extract outputs
+        
+    Returns:
+        list: Job dicts
+        
+    Raises:
+        ValueError: If an image has no matching carrier
+    """
+    audio_paths = sorted(glob.glob(audio_glob, recursive=True))
+    
+    if kind == "extract":
+        return [
+            {"audio": path, "output": os.path.join(output_dir, _stem(path) + extension)}
+            for path in audio_paths
+        ]
+    
+    if image_glob is None:
+        raise ValueError("An image pattern is required for hide jobs")
+    
+    carriers = {_stem(path): path for path in audio_paths}
+    jobs = []
+    for image_path in sorted(glob.glob(image_glob, recursive=True)):
+        if len(audio_paths) == 1:
+            audio_path = audio_paths[0]
+        elif _stem(image_path) in carriers:
+            audio_path = carriers[_stem(image_path)]
+        else:
+            raise ValueError(f"No carrier matching {image_path}")
+        
+        jobs.append({
+            "audio": audio_path,
+            "image": image_path,
+            "output": os.path.join(output_dir, _stem(image_path) + ".wav")
+        })
+    
+    return jobs
+
+
+def _run_job(task):
+    """
+    Run one job in a worker process
+    
+    Errors are reported in the result instead of raised, so one bad file
+    does not abort the batch.
+    
+    Args:
+        task (tuple): (index, kind, job, options)
+        
+    Returns:
+        dict: JSON-serializable job result
+    """
+    index, kind, job, options = task
+    report = {"index": index}
+    report.update({field: job.get(field) for field in REQUIRED_FIELDS[kind]})
+    
+    try:
+        if kind == "hide":
+            settings = dict(options)
+            settings.update({key: job[key] for key in HIDE_OPTIONS if key in job})
+            result = hide_image(job["audio"], job["image"], job["output"], verbose=False, **settings)
+        else:
+            result = extract_image(job["audio"], job["output"], verbose=False)
+    except Exception as e:
+        report.update({"success": False, "error": f"{type(e).__name__}: {e}"})
+        return report
+    
+    report.update(result)
+    return report
+
+
+def run_batch(kind, jobs, workers=None, **options):
+    """
+    Run hide or extract jobs in parallel
+    
+    Results are yielded in job order as soon as they are available.
+    
+    Args:
+        kind (str): ``"hide"`` or ``"extract"``
+        jobs (list): Job dicts, see :func:`load_manifest`
+        workers (int, optional): Number of worker processes; defaults to the
+            CPU count. With 1 the jobs run in the calling process
+        **options: Default ``hide_image`` options for hide jobs
+        
+    Yields:
+        dict: One result per job with ``success`` and either the function's
+        result keys or an ``error`` message
+    """
+    if kind not in REQUIRED_FIELDS:
+        raise ValueError(f"Unknown batch job kind: {kind}")
+    
+    tasks = [(index, kind, job, options) for index, job in enumerate(jobs)]
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_job(task)
+        return
+    
+    # Hand out jobs in batches to amortize inter-process overhead
+    chunksize = max(1, min(64, len(tasks) // (workers * 4)))
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_run_job, tasks, chunksize=chunksize)
+
+
+def batch_hide(jobs, workers=None, **options):
+    """
+    Hide many images in parallel
+    
+    Args:
+        jobs (list): Dicts with ``audio``, ``image`` and ``output`` paths
+        workers (int, optional): Number of worker processes
+        **options: ``hide_image`` options applied to every job
+        
+    Yields:
+        dict: One result per job, in order
+    """
+    return run_batch("hide", jobs, workers=workers, **options)
+
+
+def batch_extract(jobs, workers=None):
+    """
+    Extract many images in parallel
+    
+    Args:
+        jobs (list): Dicts with ``audio`` and ``output`` paths
+        workers (int, optional): Number of worker processes
+        
+    Yields:
+        dict: One result per job, in order
+    """
+    return run_batch("extract", jobs, workers=workers)
@@ -0,0 +1,166 @@
+"""
+Opt-in cache of opened carrier files
+
+Carriers are often reused for many payloads. With the cache enabled,
+:func:`audio_steg.wavio.open_samples` keeps the parsed WAV header and the
+memory mapping of each carrier it opens by path, so later calls on the same
+file skip parsing and mapping and find its pages already resident. Entries
+are keyed by the file's real path and validated against its size,
+modification time and inode, so a file that changes on disk is reopened.
+The least recently used entries are dropped once the mapped sample data
+exceeds a byte budget.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+# Default budget for the sample data of cached carriers
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def file_identity(path):
+    """
+    Identify the current version of a file
+    
+    Args:
+        path (str): Path to the file
+        
+    Returns:
+        tuple: (real path, size, mtime in ns, inode)
+    """
+    real_path = os.path.realpath(path)
+    st = os.stat(real_path)
+    return real_path, st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class CarrierCache:
+    """
+    LRU cache of open :class:`~audio_steg.wavio.SampleBuffer` objects
+    
+    Callers receive shares of the cached buffers, which they close as usual;
+    the cached mapping stays open until it is evicted or the cache cleared,
+    and until the last share still in use is closed.
+    
+    Attributes:
+        max_bytes (int): Budget for the sample data of all entries
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups that opened the file
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def open(self, path, loader):
+        """
+        Return a share of the cached buffer for ``path``, loading it if needed
+        
+        Args:
+            path (str): Path to the WAV file
+            loader (callable): Opens a buffer for a path on a cache miss
+            
+        Returns:
+            SampleBuffer: A buffer the caller must close
+        """
+        identity = file_identity(path)
+        real_path = identity[0]
+        
+        with self._lock:
+            entry = self._entries.get(real_path)
+            if entry is not None and entry[0] == identity:
+                self._entries.move_to_end(real_path)
+                self.hits += 1
+                return entry[1].share()
+            
+            self.misses += 1
+            if entry is not None:
+                # The file changed on disk since it was cached
+                self._evict(real_path)
+        
+        buffer = loader(real_path)
+        if buffer.data_size > self.max_bytes:
+            return buffer
+        
+        with self._lock:
+            if real_path in self._entries:
+                self._evict(real_path)
+            self._entries[real_path] = (identity, buffer)
+            self._size += buffer.data_size
+            
+            while self._size > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+            
+            return buffer.share()
+    
+    def _evict(self, real_path):
+        """Drop an entry; the caller holds the lock"""
+        _, buffer = self._entries.pop(real_path)
+        self._size -= buffer.data_size
+        # Shares still in use keep the mapping open; the last one to close
+        # releases it
+        buffer.close()
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            while self._entries:
+                self._evict(next(iter(self._entries)))
+    
+    def stats(self):
+        """
+        Report cache usage
+        
+        Returns:
+            dict: ``entries``, ``bytes``, ``max_bytes``, ``hits`` and ``misses``
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+_cache = None
+
+
+def enable_cache(max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Turn on carrier caching for the whole process
+    
+    Args:
+        max_bytes (int): Budget for the sample data of cached carriers
+        
+    Returns:
+        CarrierCache: The active cache
+    """
+    global _cache
+    disable_cache()
+    _cache = CarrierCache(max_bytes)
+    return _cache
+
+
+def disable_cache():
+    """Turn off carrier caching and release every cached carrier"""
+    global _cache
+    if _cache is not None:
+        _cache.clear()
+    _cache = None
+
+
+def get_cache():
+    """
+    Return the active cache
+    
+    Returns:
+        CarrierCache: The cache, or None when caching is off
+    """
+    return _cache
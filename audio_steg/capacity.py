@@ -0,0 +1,45 @@
+"""
+Carrier capacity queries
+
+Only the WAV header is read, and nothing here depends on Pillow or NumPy,
+so checking capacity stays cheap even from a freshly started process.
+"""
+
+from .header import check_bits_per_sample, payload_capacity
+from .wavio import open_samples
+
+
+def get_audio_capacity(wav_path, bits_per_sample=1):
+    """
+    Get the data capacity of a WAV file in bytes
+    
+    Args:
+        wav_path (str): Path to the WAV file
+        bits_per_sample (int): Number of LSBs of each sample that carry data
+        
+    Returns:
+        dict: Information about audio capacity including samples and bytes
+    """
+    with open_samples(wav_path) as wav:
+        n_frames = wav.n_frames
+        sampwidth = wav.sampwidth
+        n_channels = wav.n_channels
+        framerate = wav.framerate
+        
+        samples = wav.n_samples
+        
+        # Each sample can hold bits_per_sample bits, minus the header
+        check_bits_per_sample(bits_per_sample, sampwidth)
+        capacity_bytes = payload_capacity(samples, bits_per_sample)
+        
+        return {
+            "samples": samples,
+            "bits_per_sample": bits_per_sample,
+            "capacity_bytes": capacity_bytes,
+            "capacity_kb": capacity_bytes / 1024,
+            "duration_seconds": n_frames / framerate,
+            "sample_rate": framerate,
+            "channels": n_channels,
+            "sample_width": sampwidth,
+            "encoding": wav.encoding
+        }
@@ -0,0 +1,131 @@
+"""
+Payload compression codecs
+
+The codec used for a payload is recorded in the extended header by its
+numeric id, so extraction can decompress transparently.
+"""
+
+import lzma
+import zlib
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:  # pragma: no cover - optional dependency
+        _zstd = None
+
+
+# Codec names accepted by ``hide_image(compression=...)`` and their header ids.
+# ``original`` embeds the source image file bytes (e.g. the JPEG) unchanged.
+CODECS = {
+    "raw": 0,
+    "zlib": 1,
+    "lzma": 2,
+    "zstd": 3,
+    "original": 4,
+}
+
+CODEC_NAMES = {codec_id: name for name, codec_id in CODECS.items()}
+
+
+def codec_id(name):
+    """
+    Look up the header id of a codec
+    
+    Args:
+        name (str or None): Codec name; None means no compression
+        
+    Returns:
+        int: The codec id
+        
+    Raises:
+        ValueError: If the codec is unknown or its library is not installed
+    """
+    if name is None:
+        return CODECS["raw"]
+    
+    if name not in CODECS:
+        raise ValueError(
+            f"Unknown compression: {name}. Choose from: {', '.join(CODECS)}"
+        )
+    
+    if name == "zstd" and _zstd is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+    
+    return CODECS[name]
+
+
+def codec_name(codec):
+    """
+    Look up the name of a codec id read from a header
+    
+    Args:
+        codec (int): Codec id
+        
+    Returns:
+        str: The codec name
+        
+    Raises:
+        ValueError: If the id is unknown
+    """
+    if codec not in CODEC_NAMES:
+        raise ValueError(f"Unknown compression codec id: {codec} - possibly corrupted data")
+    return CODEC_NAMES[codec]
+
+
+def compress(data, name):
+    """
+    Compress raw payload bytes
+    
+    ``raw`` and ``original`` return the data unchanged.
+    
+    Args:
+        data (bytes): Data to compress
+        name (str): Codec name
+        
+    Returns:
+        bytes: Compressed data
+    """
+    codec_id(name)
+    
+    if name == "zlib":
+        return zlib.compress(data, 9)
+    if name == "lzma":
+        return lzma.compress(data)
+    if name == "zstd":
+        return _zstd.compress(data)
+    return bytes(data)
+
+
+def decompress(data, name):
+    """
+    Decompress payload bytes read from a carrier
+    
+    ``raw`` and ``original`` return the data unchanged.
+    
+    Args:
+        data (bytes): Compressed data
+        name (str): Codec name
+        
+    Returns:
+        bytes: Decompressed data
+        
+    Raises:
+        ValueError: If the data cannot be decompressed
+    """
+    codec_id(name)
+    
+    try:
+        if name == "zlib":
+            return zlib.decompress(data)
+        if name == "lzma":
+            return lzma.decompress(data)
+        if name == "zstd":
+            return _zstd.decompress(data)
+    except Exception as e:
+        # zlib, lzma and the zstd bindings all raise their own error types
+        raise ValueError(f"Could not decompress {name} payload - possibly corrupted data: {e}") from e
+    
+    return bytes(data)
@@ -0,0 +1,220 @@
+"""
+Bulk pixel comparison of two images
+
+Images are compared one strip of rows at a time, so memory stays bounded
+however large they are. Each strip is first compared as raw bytes, which is
+all identical strips cost. Differing strips are measured on NumPy arrays
+when NumPy is installed, and with Pillow's ImageChops and ImageStat
+otherwise. Neither backend creates per-pixel Python objects, and both
+produce the same statistics.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised on NumPy-less installs
+    np = None
+
+from PIL import Image, ImageChops, ImageStat
+
+
+# Number of pixels compared per strip
+STRIP_PIXELS = 1 << 20
+
+# Number of heatmap cells along the longer side of the image
+HEATMAP_SIDE = 64
+
+
+def heatmap_tile_size(size):
+    """
+    Side length of the square image tiles summarized by one heatmap cell
+    
+    Args:
+        size (tuple): (width, height) of the image
+        
+    Returns:
+        int: Tile side in pixels
+    """
+    return max(1, math.ceil(max(size) / HEATMAP_SIDE))
+
+
+def _as_rgb(img):
+    return img if img.mode == 'RGB' else img.convert('RGB')
+
+
+def _strip_stats_numpy(data1, data2, size, tile):
+    """
+    Measure the differences between two RGB strips with NumPy
+    
+    Args:
+        data1 (bytes): Raw RGB bytes of the first strip
+        data2 (bytes): Raw RGB bytes of the second strip
+        size (tuple): (width, height) of the strips
+        tile (int): Heatmap tile side
+        
+    Returns:
+        tuple: (different pixels, per-channel max error, per-channel error
+        sum, per-channel squared error sum, rows of per-tile error sums)
+    """
+    width, height = size
+    a = np.frombuffer(data1, dtype=np.uint8).reshape(height, width, 3)
+    b = np.frombuffer(data2, dtype=np.uint8).reshape(height, width, 3)
+    diff = np.abs(a.astype(np.int16) - b).astype(np.uint8)
+    
+    flat = diff.reshape(-1, 3)
+    different = int(np.count_nonzero(flat.any(axis=1)))
+    max_error = flat.max(axis=0).tolist()
+    error_sum = flat.sum(axis=0, dtype=np.int64).tolist()
+    squared = flat.astype(np.uint32)
+    squared *= squared
+    squared_sum = squared.sum(axis=0, dtype=np.int64).tolist()
+    
+    errors = diff.sum(axis=2, dtype=np.int64)
+    cells = np.add.reduceat(errors, np.arange(0, height, tile), axis=0)
+    cells = np.add.reduceat(cells, np.arange(0, width, tile), axis=1)
+    
+    return different, max_error, error_sum, squared_sum, cells.tolist()
+
+
+def _strip_stats_pil(strip1, strip2, tile):
+    """
+    Measure the differences between two RGB strips with Pillow
+    
+    Args:
+        strip1 (PIL.Image): First strip
+        strip2 (PIL.Image): Second strip
+        tile (int): Heatmap tile side
+        
+    Returns:
+        tuple: Same as :func:`_strip_stats_numpy`
+    """
+    width, height = strip1.size
+    diff = ImageChops.difference(strip1, strip2)
+    stat = ImageStat.Stat(diff)
+    
+    # A pixel differs when its largest channel difference is nonzero
+    red, green, blue = diff.split()
+    peak = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+    different = width * height - peak.histogram()[0]
+    
+    cells = [
+        [
+            int(sum(ImageStat.Stat(diff.crop((x, y, min(x + tile, width), min(y + tile, height)))).sum))
+            for x in range(0, width, tile)
+        ]
+        for y in range(0, height, tile)
+    ]
+    
+    return (
+        different,
+        [high for _, high in stat.extrema],
+        [int(total) for total in stat.sum],
+        [int(total) for total in stat.sum2],
+        cells
+    )
+
+
+def compare_pixels(img1, img2):
+    """
+    Compare two images of the same size
+    
+    Both images are compared as RGB.
+    
+    Args:
+        img1 (PIL.Image): First image
+        img2 (PIL.Image): Second image
+        
+    Returns:
+        dict: ``identical``, ``similarity`` (percentage of equal pixels),
+        ``different_pixels``, ``total_pixels``, per-channel ``max_abs_error``
+        and ``mean_abs_error``, ``psnr`` in dB (``inf`` for identical images),
+        and ``heatmap``, rows of the mean absolute error of each
+        ``heatmap_tile`` x ``heatmap_tile`` tile
+        
+    Raises:
+        ValueError: If the images differ in size
+    """
+    if img1.size != img2.size:
+        raise ValueError(f"Images differ in size: {img1.size} and {img2.size}")
+    
+    width, height = img1.size
+    tile = heatmap_tile_size(img1.size)
+    
+    # Strips hold whole rows of heatmap tiles
+    strip_rows = max(tile, STRIP_PIXELS // max(width, 1) // tile * tile)
+    
+    different = 0
+    max_error = [0, 0, 0]
+    error_sum = [0, 0, 0]
+    squared_sum = [0, 0, 0]
+    cell_sums = []
+    
+    for top in range(0, height, strip_rows):
+        box = (0, top, width, min(top + strip_rows, height))
+        strip1 = _as_rgb(img1.crop(box))
+        strip2 = _as_rgb(img2.crop(box))
+        data1 = strip1.tobytes()
+        data2 = strip2.tobytes()
+        
+        if data1 == data2:
+            n_rows = -(-(box[3] - top) // tile)
+            cell_sums.extend([0] * -(-width // tile) for _ in range(n_rows))
+            continue
+        
+        if np is not None:
+            stats = _strip_stats_numpy(data1, data2, strip1.size, tile)
+        else:
+            stats = _strip_stats_pil(strip1, strip2, tile)
+        
+        different += stats[0]
+        max_error = [max(old, new) for old, new in zip(max_error, stats[1])]
+        error_sum = [old + new for old, new in zip(error_sum, stats[2])]
+        squared_sum = [old + new for old, new in zip(squared_sum, stats[3])]
+        cell_sums.extend(stats[4])
+    
+    total_pixels = width * height
+    n_values = max(total_pixels, 1)
+    mse = sum(squared_sum) / (3 * n_values)
+    
+    heatmap = []
+    for row, sums in enumerate(cell_sums):
+        cell_height = min(tile, height - row * tile)
+        heatmap.append([
+            total / (3 * cell_height * min(tile, width - col * tile))
+            for col, total in enumerate(sums)
+        ])
+    
+    return {
+        "identical": different == 0,
+        "similarity": (total_pixels - different) / n_values * 100 if total_pixels else 100.0,
+        "different_pixels": different,
+        "total_pixels": total_pixels,
+        "max_abs_error": max_error,
+        "mean_abs_error": [total / n_values for total in error_sum],
+        "psnr": 10 * math.log10(255 ** 2 / mse) if mse else math.inf,
+        "heatmap": heatmap,
+        "heatmap_tile": tile
+    }
+
+
+def render_heatmap(heatmap, scale=8):
+    """
+    Draw a comparison heatmap as a grayscale image
+    
+    Brightness is scaled so the tile with the largest error is white.
+    
+    Args:
+        heatmap (list): Rows of per-tile errors, as from :func:`compare_pixels`
+        scale (int): Pixels per tile side in the output
+        
+    Returns:
+        PIL.Image: The heatmap in mode ``L``
+    """
+    rows = len(heatmap)
+    cols = len(heatmap[0]) if rows else 0
+    peak = max((value for row in heatmap for value in row), default=0) or 1
+    
+    img = Image.new('L', (cols, rows))
+    img.putdata([round(value / peak * 255) for row in heatmap for value in row])
+    return img.resize((cols * scale, rows * scale), Image.NEAREST)
@@ -0,0 +1,267 @@
+"""
+Bulk LSB engine for embedding and extracting payload bits in raw PCM buffers
+
+Samples are handled as raw little-endian bytes: the low bits of every sample
+live in the sample's first byte, so the LSB plane is simply every
+``sampwidth``-th byte of the frame buffer. NumPy is used when it
+is installed; otherwise a pure Python fallback produces identical output.
+
+The fallback never loops over bits or samples in Python. A payload is split
+into groups of bytes that fill a whole number of samples (one byte for 1, 2
+or 4 bits per sample, three bytes per eight samples for 3). Each byte
+position of a group and each sample of a group is a strided slice, which
+``bytes.translate`` maps through a precomputed 256-entry table to the bits
+it contributes. The contributions are combined with a single big-integer OR.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised on NumPy-less installs
+    np = None
+
+from .header import samples_needed
+
+
+SUPPORTED_SAMPLE_WIDTHS = (1, 2, 3, 4)
+
+
+def _group_shape(bits_per_sample):
+    """(payload bytes, samples) in the smallest group that fills whole samples"""
+    common = math.gcd(8, bits_per_sample)
+    return bits_per_sample // common, 8 // common
+
+
+def _build_tables(bits_per_sample):
+    """
+    Translation tables for the pure Python fallback
+    
+    Returns:
+        tuple: ``embed[j][p]`` maps payload byte ``p`` of a group to the bits
+        it places in sample ``j``, ``extract[j][p]`` maps the low byte of
+        sample ``j`` to the bits it places in payload byte ``p`` (None where
+        they do not overlap), and ``clear`` zeroes the payload bits of a low
+        byte
+    """
+    n_bytes, n_samples = _group_shape(bits_per_sample)
+    mask = (1 << bits_per_sample) - 1
+    embed = []
+    extract = []
+    
+    for j in range(n_samples):
+        embed.append([])
+        extract.append([])
+        for p in range(n_bytes):
+            overlaps = j * bits_per_sample < 8 * (p + 1) and 8 * p < (j + 1) * bits_per_sample
+            if not overlaps:
+                embed[j].append(None)
+                extract[j].append(None)
+                continue
+            embed[j].append(bytes(
+                ((value << 8 * p) >> j * bits_per_sample) & mask for value in range(256)
+            ))
+            extract[j].append(bytes(
+                (((value & mask) << j * bits_per_sample) >> 8 * p) & 0xFF for value in range(256)
+            ))
+    
+    clear = bytes(value & (0xFF ^ mask) for value in range(256))
+    return embed, extract, clear
+
+
+_TABLES = {bits_per_sample: _build_tables(bits_per_sample) for bits_per_sample in (1, 2, 3, 4)}
+
+
+def check_sample_width(sampwidth):
+    """
+    Validate that a sample width is supported by the engine
+
+    Args:
+        sampwidth (int): Sample width in bytes
+
+    Raises:
+        ValueError: If the sample width is not supported
+    """
+    if sampwidth not in SUPPORTED_SAMPLE_WIDTHS:
+        raise ValueError(f"Unsupported sample width: {sampwidth}")
+
+
+def embed_bits(frames, sampwidth, data, sample_offset=0, bits_per_sample=1):
+    """
+    Write the bits of ``data`` into the LSBs of a sample buffer in place
+
+    Bits are taken least significant first from each byte and stored
+    ``bits_per_sample`` at a time in the low bits of consecutive samples,
+    starting at sample ``sample_offset``. The final sample is zero-padded.
+
+    Args:
+        frames (bytearray): Writable raw frame buffer
+        sampwidth (int): Sample width in bytes
+        data (bytes): Payload to embed
+        sample_offset (int): Index of the first sample to modify
+        bits_per_sample (int): Number of low bits of each sample to use
+
+    Raises:
+        ValueError: If the buffer does not hold enough samples
+    """
+    check_sample_width(sampwidth)
+    n_used = samples_needed(len(data), bits_per_sample)
+    n_samples = len(frames) // sampwidth
+
+    if sample_offset + n_used > n_samples:
+        raise ValueError(
+            f"Not enough samples to embed data. Need {sample_offset + n_used}, have {n_samples}"
+        )
+
+    if n_used == 0:
+        return
+
+    start = sample_offset * sampwidth
+    stop = start + n_used * sampwidth
+    mask = (1 << bits_per_sample) - 1
+
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder='little')
+        low_bytes = np.frombuffer(frames, dtype=np.uint8)[start:stop:sampwidth]
+        low_bytes &= 0xFF ^ mask
+        if bits_per_sample == 1:
+            low_bytes |= bits
+        else:
+            padded = np.zeros(n_used * bits_per_sample, dtype=np.uint8)
+            padded[:bits.size] = bits
+            low_bytes |= np.packbits(
+                padded.reshape(n_used, bits_per_sample), axis=1, bitorder='little'
+            )[:, 0]
+        return
+
+    embed, _, clear = _TABLES[bits_per_sample]
+    group_bytes, group_samples = _group_shape(bits_per_sample)
+    n_groups = -(-len(data) // group_bytes)
+    data = bytes(data) + bytes(n_groups * group_bytes - len(data))
+    columns = [data[p::group_bytes] for p in range(group_bytes)]
+    
+    # Low bits for every sample, one strided slice per sample of the group
+    values = bytearray(n_groups * group_samples)
+    for j, tables in enumerate(embed):
+        combined = 0
+        for column, table in zip(columns, tables):
+            if table is not None:
+                combined |= int.from_bytes(column.translate(table), 'little')
+        values[j::group_samples] = combined.to_bytes(n_groups, 'little')
+    
+    low_bytes = bytes(frames[start:stop:sampwidth]).translate(clear)
+    merged = int.from_bytes(low_bytes, 'little') | int.from_bytes(values[:n_used], 'little')
+    frames[start:stop:sampwidth] = merged.to_bytes(n_used, 'little')
+
+
+def extract_bytes(frames, sampwidth, n_bytes, sample_offset=0, bits_per_sample=1):
+    """
+    Read ``n_bytes`` of payload from the LSBs of a sample buffer
+
+    This is the inverse of :func:`embed_bits`: ``bits_per_sample`` bits per
+    sample, packed least significant bit first, starting at sample
+    ``sample_offset``.
+
+    Args:
+        frames (bytes-like): Raw frame buffer
+        sampwidth (int): Sample width in bytes
+        n_bytes (int): Number of payload bytes to read
+        sample_offset (int): Index of the first sample to read
+        bits_per_sample (int): Number of low bits of each sample to read
+
+    Returns:
+        bytes: The extracted payload
+
+    Raises:
+        ValueError: If the buffer does not hold enough samples
+    """
+    check_sample_width(sampwidth)
+    n_bits = n_bytes * 8
+    n_used = samples_needed(n_bytes, bits_per_sample)
+    n_samples = len(frames) // sampwidth
+
+    if sample_offset + n_used > n_samples:
+        raise ValueError(
+            f"Not enough samples to extract data. Need {sample_offset + n_used}, have {n_samples}"
+        )
+
+    start = sample_offset * sampwidth
+    stop = start + n_used * sampwidth
+
+    if np is not None:
+        low_bytes = np.frombuffer(frames, dtype=np.uint8)[start:stop:sampwidth]
+        if bits_per_sample == 1:
+            bits = low_bytes & 1
+        else:
+            bits = np.unpackbits(
+                low_bytes.reshape(n_used, 1), axis=1, bitorder='little'
+            )[:, :bits_per_sample].reshape(-1)[:n_bits]
+        return np.packbits(bits, bitorder='little').tobytes()
+
+    _, extract, _ = _TABLES[bits_per_sample]
+    group_bytes, group_samples = _group_shape(bits_per_sample)
+    n_groups = -(-n_bytes // group_bytes)
+    low_bytes = bytes(frames[start:stop:sampwidth])
+    low_bytes += bytes(n_groups * group_samples - n_used)
+    columns = [low_bytes[j::group_samples] for j in range(group_samples)]
+    
+    # Payload bytes for every group, one strided slice per byte of the group
+    data = bytearray(n_groups * group_bytes)
+    for p in range(group_bytes):
+        combined = 0
+        for column, tables in zip(columns, extract):
+            if tables[p] is not None:
+                combined |= int.from_bytes(column.translate(tables[p]), 'little')
+        data[p::group_bytes] = combined.to_bytes(n_groups, 'little')
+    
+    return bytes(data[:n_bytes])
+
+
+def extract_runs(frames, sampwidth, sample_offsets, n_bytes, bits_per_sample=1):
+    """
+    Read ``n_bytes`` of payload starting at each of many sample offsets
+    
+    Used for random access, e.g. reading individual pixels. When a run fills
+    its samples exactly, the low bytes of all runs are gathered in one pass
+    and decoded together instead of run by run.
+    
+    Args:
+        frames (bytes-like): Raw frame buffer
+        sampwidth (int): Sample width in bytes
+        sample_offsets (list): Index of the first sample of each run
+        n_bytes (int): Number of payload bytes in each run
+        bits_per_sample (int): Number of low bits of each sample to read
+        
+    Returns:
+        bytes: The runs, concatenated in order
+        
+    Raises:
+        ValueError: If a run extends past the end of the buffer
+    """
+    check_sample_width(sampwidth)
+    run_samples = samples_needed(n_bytes, bits_per_sample)
+    n_samples = len(frames) // sampwidth
+    
+    if sample_offsets and max(sample_offsets) + run_samples > n_samples:
+        raise ValueError(
+            f"Not enough samples to extract data. Need {max(sample_offsets) + run_samples}, have {n_samples}"
+        )
+    
+    if n_bytes * 8 % bits_per_sample:
+        # Runs end part-way through a sample and cannot be decoded together
+        return b''.join(
+            extract_bytes(frames, sampwidth, n_bytes, offset, bits_per_sample)
+            for offset in sample_offsets
+        )
+    
+    if np is not None:
+        starts = np.asarray(sample_offsets, dtype=np.intp)
+        index = (starts[:, None] + np.arange(run_samples, dtype=np.intp)).reshape(-1) * sampwidth
+        low_bytes = np.frombuffer(frames, dtype=np.uint8)[index]
+    else:
+        low_bytes = b''.join(
+            bytes(frames[offset * sampwidth:(offset + run_samples) * sampwidth:sampwidth])
+            for offset in sample_offsets
+        )
+    
+    return extract_bytes(low_bytes, 1, n_bytes * len(sample_offsets), bits_per_sample=bits_per_sample)
@@ -0,0 +1,413 @@
+"""
+Payload header layout
+
+Two header layouts exist, both stored one bit per sample at the start of the
+carrier:
+
+- Legacy (12 bytes): ``<III`` width, height, data size. The image data
+  follows one bit per sample. Written whenever no extended option is used, so
+  such files stay readable by older releases.
+- Extended (20 bytes): ``<4sBBBBIII`` magic ``LSBX``, header version, bits
+  per sample, compression codec, flags, width, height, data size.
+  The data that follows uses ``bits_per_sample`` bits of every sample and
+  the data size is that of the (possibly compressed) embedded bytes.
+  
+Flags are only written by header version 2, so older releases reject such
+files instead of misreading them. :data:`FLAG_SHARDED` marks one shard of a
+payload split across several carriers; the extended header is then followed
+by ``<8sHHI`` payload ID, shard index, shard count and the size of the whole
+payload, and the data size is that of the shard.
+
+:data:`FLAG_CONTAINER` marks a carrier holding several named payloads. The
+extended header is followed by ``<II`` entry count and index size, width and
+height are zero and the data size covers the index and all payloads. The
+data starts with the index, one ``<BBHIIII`` entry per payload (codec,
+reserved, name length, width, height, offset, length) followed by its UTF-8
+name. Offsets are relative to the end of the index.
+"""
+
+import struct
+
+from .codecs import codec_name
+
+
+LEGACY_FORMAT = '<III'
+LEGACY_SIZE = struct.calcsize(LEGACY_FORMAT)
+
+MAGIC = b'LSBX'
+EXTENDED_VERSION = 1
+FLAGS_VERSION = 2
+EXTENDED_FORMAT = '<4sBBBBIII'
+EXTENDED_SIZE = struct.calcsize(EXTENDED_FORMAT)
+
+# Header flags
+FLAG_SHARDED = 0x01
+FLAG_CONTAINER = 0x02
+KNOWN_FLAGS = FLAG_SHARDED | FLAG_CONTAINER
+
+SHARD_FORMAT = '<8sHHI'
+SHARD_SIZE = struct.calcsize(SHARD_FORMAT)
+
+CONTAINER_FORMAT = '<II'
+CONTAINER_SIZE = struct.calcsize(CONTAINER_FORMAT)
+
+INDEX_ENTRY_FORMAT = '<BBHIIII'
+INDEX_ENTRY_SIZE = struct.calcsize(INDEX_ENTRY_FORMAT)
+
+# Largest number of carriers a payload may be split across
+MAX_SHARDS = 0xFFFF
+
+# Largest width or height of an image that may be hidden, and accepted when
+# reading a header
+MAX_DIMENSION = 10000
+
+# Highest number of LSBs per sample that may carry data, by sample width
+MAX_BITS_PER_SAMPLE = {1: 1, 2: 4, 3: 4, 4: 4}
+
+
+def check_bits_per_sample(bits_per_sample, sampwidth=None):
+    """
+    Validate a bits-per-sample setting
+    
+    Args:
+        bits_per_sample (int): Number of LSBs per sample that carry data
+        sampwidth (int, optional): Sample width in bytes of the carrier
+        
+    Raises:
+        ValueError: If the setting is out of range for the sample width
+    """
+    limit = max(MAX_BITS_PER_SAMPLE.values())
+    if sampwidth is not None:
+        limit = MAX_BITS_PER_SAMPLE.get(sampwidth, 1)
+    
+    if not isinstance(bits_per_sample, int) or not 1 <= bits_per_sample <= limit:
+        if sampwidth is None:
+            raise ValueError(f"bits_per_sample must be between 1 and {limit}, got {bits_per_sample}")
+        raise ValueError(
+            f"bits_per_sample must be between 1 and {limit} for "
+            f"{sampwidth * 8}-bit audio, got {bits_per_sample}"
+        )
+
+
+def check_dimensions(width, height):
+    """
+    Validate the size of an image to hide
+    
+    Args:
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        
+    Raises:
+        ValueError: If extraction would reject a header with these dimensions
+    """
+    if width > MAX_DIMENSION or height > MAX_DIMENSION:
+        raise ValueError(
+            f"Image is {width}x{height} pixels, but only images up to "
+            f"{MAX_DIMENSION}x{MAX_DIMENSION} can be extracted"
+        )
+
+
+def header_size(bits_per_sample=1, codec=0, sharded=False, container=False):
+    """
+    Size in bytes of the header written for the given options
+    
+    Args:
+        bits_per_sample (int): Number of LSBs per sample that carry data
+        codec (int): Compression codec id
+        sharded (bool): The header describes one shard of a payload
+        container (bool): The header describes a container of payloads
+        
+    Returns:
+        int: Header size in bytes
+    """
+    if sharded:
+        return EXTENDED_SIZE + SHARD_SIZE
+    if container:
+        return EXTENDED_SIZE + CONTAINER_SIZE
+    return LEGACY_SIZE if bits_per_sample == 1 and codec == 0 else EXTENDED_SIZE
+
+
+def pack_header(width, height, data_size, bits_per_sample=1, codec=0, shard=None, container=None):
+    """
+    Build the header for a payload
+    
+    The legacy layout is used unless an option needs the extended one.
+    
+    Args:
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        data_size (int): Size of the embedded data in bytes
+        bits_per_sample (int): Number of LSBs per sample that carry data
+        codec (int): Compression codec id
+        shard (dict, optional): ``payload_id`` (8 bytes), ``index``,
+            ``count`` and ``total_size`` when the data is one shard of a
+            larger payload
+        container (dict, optional): ``entries`` and ``index_size`` when the
+            data is a container of payloads
+            
+    Returns:
+        bytes: The packed header
+    """
+    if container is not None:
+        return struct.pack(
+            EXTENDED_FORMAT, MAGIC, FLAGS_VERSION, bits_per_sample, codec, FLAG_CONTAINER,
+            width, height, data_size
+        ) + struct.pack(CONTAINER_FORMAT, container["entries"], container["index_size"])
+    
+    if shard is not None:
+        return struct.pack(
+            EXTENDED_FORMAT, MAGIC, FLAGS_VERSION, bits_per_sample, codec, FLAG_SHARDED,
+            width, height, data_size
+        ) + struct.pack(
+            SHARD_FORMAT, shard["payload_id"], shard["index"], shard["count"], shard["total_size"]
+        )
+    
+    if header_size(bits_per_sample, codec) == LEGACY_SIZE:
+        return struct.pack(LEGACY_FORMAT, width, height, data_size)
+    
+    return struct.pack(
+        EXTENDED_FORMAT, MAGIC, EXTENDED_VERSION, bits_per_sample, codec, 0,
+        width, height, data_size
+    )
+
+
+def is_extended(prefix):
+    """
+    Check whether header bytes start an extended header
+    
+    Args:
+        prefix (bytes): At least the first 4 bytes of the header
+        
+    Returns:
+        bool: True for an extended header
+    """
+    return bytes(prefix[:len(MAGIC)]) == MAGIC
+
+
+def full_header_size(prefix):
+    """
+    Size of the header that starts with ``prefix``
+    
+    Args:
+        prefix (bytes): At least :data:`EXTENDED_SIZE` bytes for an extended
+            header, :data:`LEGACY_SIZE` otherwise
+            
+    Returns:
+        int: Header size in bytes, including any flag extensions
+    """
+    if not is_extended(prefix):
+        return LEGACY_SIZE
+    
+    version, flags = prefix[4], prefix[7]
+    if version < FLAGS_VERSION:
+        return EXTENDED_SIZE
+    if flags & FLAG_SHARDED:
+        return EXTENDED_SIZE + SHARD_SIZE
+    if flags & FLAG_CONTAINER:
+        return EXTENDED_SIZE + CONTAINER_SIZE
+    return EXTENDED_SIZE
+
+
+def parse_header(data):
+    """
+    Decode a header
+    
+    Args:
+        data (bytes): The header bytes; 12 bytes are enough for a legacy
+            header, extended headers need :func:`full_header_size` bytes
+            
+    Returns:
+        dict: ``width``, ``height``, ``data_size``, ``bits_per_sample``,
+        ``codec``, ``header_size``, ``shard``, which is None unless the
+        data is one shard of a payload, and otherwise holds the hex
+        ``payload_id``, ``index``, ``count`` and ``total_size``, and
+        ``container``, which is None unless the data is a container, and
+        otherwise holds ``entries`` and ``index_size``
+        
+    Raises:
+        ValueError: If the header is truncated or uses an unknown version
+            or flag
+    """
+    if is_extended(data):
+        if len(data) < EXTENDED_SIZE:
+            raise ValueError("Truncated header - possibly corrupted data")
+        
+        _, version, bits_per_sample, codec, flags, width, height, data_size = struct.unpack(
+            EXTENDED_FORMAT, bytes(data[:EXTENDED_SIZE])
+        )
+        if version not in (EXTENDED_VERSION, FLAGS_VERSION):
+            raise ValueError(f"Unsupported header version: {version}")
+        if version == EXTENDED_VERSION:
+            flags = 0
+        if flags & ~KNOWN_FLAGS or flags == FLAG_SHARDED | FLAG_CONTAINER:
+            raise ValueError(f"Unsupported header flags: {flags:#04x}")
+        
+        size = full_header_size(data)
+        if len(data) < size:
+            raise ValueError("Truncated header - possibly corrupted data")
+        
+        shard = None
+        if flags & FLAG_SHARDED:
+            payload_id, index, count, total_size = struct.unpack(
+                SHARD_FORMAT, bytes(data[EXTENDED_SIZE:size])
+            )
+            shard = {"payload_id": payload_id.hex(), "index": index, "count": count, "total_size": total_size}
+        
+        container = None
+        if flags & FLAG_CONTAINER:
+            entries, index_size = struct.unpack(CONTAINER_FORMAT, bytes(data[EXTENDED_SIZE:size]))
+            container = {"entries": entries, "index_size": index_size}
+        
+        return {
+            "width": width,
+            "height": height,
+            "data_size": data_size,
+            "bits_per_sample": bits_per_sample,
+            "codec": codec,
+            "header_size": size,
+            "shard": shard,
+            "container": container
+        }
+    
+    width, height, data_size = struct.unpack(LEGACY_FORMAT, bytes(data[:LEGACY_SIZE]))
+    return {
+        "width": width,
+        "height": height,
+        "data_size": data_size,
+        "bits_per_sample": 1,
+        "codec": 0,
+        "header_size": LEGACY_SIZE,
+        "shard": None,
+        "container": None
+    }
+
+
+def validate_header(header):
+    """
+    Sanity-check decoded header values
+    
+    Args:
+        header (dict): Header as returned by :func:`parse_header`
+        
+    Raises:
+        ValueError: If the values cannot describe a hidden image
+    """
+    container = header.get("container")
+    if container is not None:
+        if container["entries"] < 1 or not 0 < container["index_size"] <= header["data_size"]:
+            raise ValueError("Invalid container header - possibly corrupted data")
+        check_bits_per_sample(header["bits_per_sample"])
+        return
+    
+    if header["width"] <= 0 or header["height"] <= 0 or header["data_size"] <= 0:
+        raise ValueError("Invalid header data - no image found or corrupted data")
+    
+    if header["width"] > MAX_DIMENSION or header["height"] > MAX_DIMENSION:
+        raise ValueError("Unrealistic image dimensions - possibly corrupted data")
+    
+    check_bits_per_sample(header["bits_per_sample"])
+    codec_name(header["codec"])
+
+    shard = header.get("shard")
+    if shard is not None:
+        if not 0 <= shard["index"] < shard["count"] or header["data_size"] > shard["total_size"]:
+            raise ValueError("Invalid shard header - possibly corrupted data")
+
+
+def pack_index(entries):
+    """
+    Build the index of a container
+    
+    Args:
+        entries (list): Dicts with ``name``, ``codec``, ``width``,
+            ``height``, ``offset`` and ``length``
+            
+    Returns:
+        bytes: The packed index
+    """
+    parts = []
+    for entry in entries:
+        name = entry["name"].encode('utf-8')
+        parts.append(struct.pack(
+            INDEX_ENTRY_FORMAT, entry["codec"], 0, len(name),
+            entry["width"], entry["height"], entry["offset"], entry["length"]
+        ))
+        parts.append(name)
+    return b''.join(parts)
+
+
+def parse_index(data, count):
+    """
+    Decode the index of a container
+    
+    Args:
+        data (bytes): The index bytes
+        count (int): Number of entries, from the header
+        
+    Returns:
+        dict: Entries by name, in stored order; each holds ``name``,
+        ``codec``, ``width``, ``height``, ``offset`` and ``length``
+        
+    Raises:
+        ValueError: If the index is truncated or inconsistent
+    """
+    entries = {}
+    position = 0
+    for _ in range(count):
+        if position + INDEX_ENTRY_SIZE > len(data):
+            raise ValueError("Truncated payload index - possibly corrupted data")
+        codec, _, name_size, width, height, offset, length = struct.unpack_from(INDEX_ENTRY_FORMAT, data, position)
+        position += INDEX_ENTRY_SIZE
+        
+        try:
+            name = bytes(data[position:position + name_size]).decode('utf-8')
+        except UnicodeDecodeError:
+            raise ValueError("Invalid payload name in index - possibly corrupted data")
+        if len(name.encode('utf-8')) != name_size or name in entries:
+            raise ValueError("Invalid payload index - possibly corrupted data")
+        position += name_size
+        
+        entries[name] = {
+            "name": name, "codec": codec, "width": width, "height": height,
+            "offset": offset, "length": length
+        }
+    
+    return entries
+
+
+def samples_needed(n_bytes, bits_per_sample=1):
+    """
+    Number of samples needed to hold ``n_bytes`` of data
+    
+    Args:
+        n_bytes (int): Number of data bytes
+        bits_per_sample (int): Number of LSBs per sample that carry data
+        
+    Returns:
+        int: Number of samples
+    """
+    return -(-n_bytes * 8 // bits_per_sample)
+
+
+def payload_capacity(n_samples, bits_per_sample=1, codec=0, sharded=False, container=False):
+    """
+    Number of data bytes that fit in a carrier after the header
+    
+    Args:
+        n_samples (int): Total number of samples in the carrier
+        bits_per_sample (int): Number of LSBs per sample that carry data
+        codec (int): Compression codec id
+        sharded (bool): The carrier holds one shard of a payload
+        container (bool): The carrier holds a container of payloads; the
+            capacity then includes the index
+            
+    Returns:
+        int: Capacity in bytes
+    """
+    size = header_size(bits_per_sample, codec, sharded, container)
+    if size == LEGACY_SIZE:
+        # Each sample can hold 1 bit; the header takes 12 bytes
+        return (n_samples // 8) - LEGACY_SIZE
+    
+    data_samples = n_samples - size * 8
+    return (data_samples * bits_per_sample) // 8
@@ -0,0 +1,104 @@
+"""
+Per-phase instrumentation for hide and extract operations
+
+Each operation records wall time, bytes processed and, when ``tracemalloc``
+is tracing, peak memory allocated for each of its phases (reading the
+carrier, loading the image, embedding, writing, ...). The report is returned
+under the ``metrics`` key of the result, passed to an optional callback and
+logged at DEBUG level on the ``audio_steg.metrics`` logger.
+"""
+
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    """
+    Collects timings for the phases of one operation
+    
+    A phase entered several times (e.g. once per chunk) accumulates its time
+    and bytes into a single entry.
+    
+    Args:
+        operation (str): Name of the operation being measured
+    """
+    
+    def __init__(self, operation):
+        self.operation = operation
+        self.phases = {}
+        self._start = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name, nbytes=0):
+        """
+        Measure a phase
+        
+        Args:
+            name (str): Phase name
+            nbytes (int): Bytes processed by the phase; more can be added to
+                the yielded entry's ``bytes`` before the block ends
+                
+        Yields:
+            dict: The phase entry
+        """
+        entry = self.phases.setdefault(name, {"seconds": 0.0, "bytes": 0, "peak_alloc_bytes": None})
+        entry["bytes"] += nbytes
+        
+        tracing = tracemalloc.is_tracing() and hasattr(tracemalloc, 'reset_peak')
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] += time.perf_counter() - start
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                entry["peak_alloc_bytes"] = max(peak, entry["peak_alloc_bytes"] or 0)
+    
+    def report(self):
+        """
+        Summarize the phases measured so far
+        
+        Returns:
+            dict: ``operation``, ``total_seconds`` and ``phases``, a dict of
+            phase name to ``seconds``, ``bytes`` and ``peak_alloc_bytes``
+            (None unless ``tracemalloc`` is tracing)
+        """
+        return {
+            "operation": self.operation,
+            "total_seconds": time.perf_counter() - self._start,
+            "phases": {name: dict(entry) for name, entry in self.phases.items()}
+        }
+    
+    def finish(self, callback=None):
+        """
+        Produce the final report and send it to the configured sinks
+        
+        Args:
+            callback (callable, optional): Called with the report
+            
+        Returns:
+            dict: The report
+        """
+        report = self.report()
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            for name, entry in report["phases"].items():
+                logger.debug(
+                    "%s %s: %.6f s, %d bytes, peak alloc %s",
+                    self.operation, name, entry["seconds"], entry["bytes"], entry["peak_alloc_bytes"]
+                )
+            logger.debug("%s total: %.6f s", self.operation, report["total_seconds"])
+        
+        if callback is not None:
+            callback(report)
+        
+        return report
@@ -0,0 +1,300 @@
+"""
+Payload helpers shared by every way of hiding and extracting images
+
+Covers loading and encoding the image to hide, decoding it again, and
+writing or reading payload bits in a carrier. Single images, containers and
+shards all go through these functions.
+"""
+
+import io
+import math
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+
+from .codecs import compress, decompress
+from .engine import embed_bits, extract_bytes
+from .header import samples_needed
+from .metrics import Metrics
+from .progress import OperationCancelled, ProgressTracker
+from .riff import write_wav_header
+from .wavio import copy_range
+
+
+# Number of samples the streaming embedder processes at a time
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Bytes of untouched sample data copied between progress and cancel checks
+TAIL_COPY_SIZE = 1 << 26
+
+
+def is_path(obj):
+    """True if ``obj`` names a file rather than holding data"""
+    return isinstance(obj, (str, os.PathLike))
+
+
+def describe(source):
+    """Printable name of a path or in-memory source for progress output"""
+    if is_path(source):
+        return os.fspath(source)
+    if isinstance(source, Image.Image):
+        return f"<{source.width}x{source.height} {source.mode} image>"
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{memoryview(source).nbytes} bytes in memory>"
+    return f"<{type(source).__name__}>"
+
+
+def open_image(image):
+    """
+    Load the image to hide from any supported source
+    
+    Args:
+        image (str, bytes, file or PIL.Image): Image path, encoded image
+            bytes, a binary file object, or an already loaded image
+            
+    Returns:
+        tuple: (image, source) where ``source`` is the path or encoded bytes
+        the image came from, or None for an ``Image`` object
+    """
+    if isinstance(image, Image.Image):
+        return image, None
+    
+    if is_path(image):
+        return Image.open(image), image
+    
+    if hasattr(image, 'read'):
+        image = image.read()
+    
+    source = bytes(image)
+    return Image.open(io.BytesIO(source)), source
+
+
+def encode_payload(img, compression, source=None, source_format=None):
+    """
+    Produce the bytes to embed for an RGB image
+    
+    Args:
+        img (PIL.Image): RGB image
+        compression (str): Codec name
+        source (str or bytes, optional): File the image was loaded from, or
+            its encoded bytes; with the ``original`` codec these are embedded
+            unchanged
+        source_format (str, optional): Pillow format used to re-encode the
+            image for the ``original`` codec when no source file applies
+            
+    Returns:
+        bytes: The data to embed
+    """
+    if compression == "original":
+        if is_path(source):
+            with open(source, 'rb') as f:
+                return f.read()
+        if source is not None:
+            return source
+        
+        buf = io.BytesIO()
+        img.save(buf, format=source_format or 'PNG')
+        return buf.getvalue()
+    
+    if compression == "raw":
+        return img.tobytes()
+    
+    return compress(img.tobytes(), compression)
+
+
+def decode_payload(data, compression, width, height):
+    """
+    Rebuild an RGB image from embedded bytes
+    
+    Args:
+        data (bytes): Embedded data
+        compression (str): Codec name from the header
+        width (int): Image width from the header
+        height (int): Image height from the header
+        
+    Returns:
+        PIL.Image: The image
+        
+    Raises:
+        ValueError: If the data cannot be decoded
+    """
+    if compression == "original":
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except (OSError, SyntaxError) as e:
+            raise ValueError(f"Could not decode embedded image file - possibly corrupted data: {e}") from e
+        
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img
+    
+    return Image.frombytes('RGB', (width, height), decompress(data, compression))
+
+
+def write_stego(carrier, dst, segments, chunk_size, metrics=None, tracker=None):
+    """
+    Write a carrier with embedded data to an output WAV file
+    
+    Samples that receive payload bits are streamed through the engine in
+    fixed-size chunks; the untouched remainder is copied as-is, in pieces of
+    ``TAIL_COPY_SIZE`` bytes. Progress is reported and cancellation checked
+    after every chunk and piece.
+    
+    Args:
+        carrier (SampleBuffer): Mapped input WAV file
+        dst (file): Output file opened in binary mode
+        segments (list): Contiguous ``(sample_offset, data, bits_per_sample)``
+            tuples in order, the first one starting at sample 0
+        chunk_size (int): Number of samples processed per chunk
+        metrics (Metrics, optional): Receives ``read``, ``embed`` and
+            ``write`` timings
+        tracker (ProgressTracker, optional): Receives progress in bytes of
+            sample data written
+            
+    Raises:
+        OperationCancelled: If the tracker's cancel token is set
+    """
+    if metrics is None:
+        metrics = Metrics("write")
+    if tracker is None:
+        tracker = ProgressTracker(carrier.data_size)
+    
+    tracker.check()
+    
+    sampwidth = carrier.sampwidth
+    
+    # Chunks span a multiple of 8 samples, so they always start on a byte
+    # boundary of the data whatever the bits per sample
+    chunk_samples = max(8, chunk_size - chunk_size % 8)
+    
+    with metrics.phase("write") as phase:
+        write_wav_header(
+            dst, carrier.n_channels, sampwidth, carrier.framerate, carrier.data_size,
+            fmt_chunk=carrier.fmt_chunk, rf64=carrier.rf64
+        )
+        phase["bytes"] += carrier.data_offset
+    
+    end = 0
+    for sample_offset, data, bits_per_sample in segments:
+        n_used = samples_needed(len(data), bits_per_sample)
+        
+        for start in range(0, n_used, chunk_samples):
+            stop = min(start + chunk_samples, n_used)
+            n_bytes = (stop - start) * sampwidth
+            
+            # Copying the chunk out of the mapping is where its pages are read
+            with metrics.phase("read", n_bytes):
+                chunk = bytearray(carrier.data[(sample_offset + start) * sampwidth:(sample_offset + stop) * sampwidth])
+            
+            with metrics.phase("embed", n_bytes):
+                piece = data[start * bits_per_sample // 8:stop * bits_per_sample // 8]
+                embed_bits(chunk, sampwidth, piece, bits_per_sample=bits_per_sample)
+            
+            with metrics.phase("write", n_bytes):
+                dst.write(chunk)
+            
+            tracker.advance(n_bytes)
+        
+        end = sample_offset + n_used
+    
+    prefix_size = end * sampwidth
+    for offset in range(prefix_size, carrier.data_size, TAIL_COPY_SIZE):
+        length = min(TAIL_COPY_SIZE, carrier.data_size - offset)
+        
+        with metrics.phase("write", length):
+            if carrier.file is None:
+                # In-memory carrier: write the remainder straight from its buffer
+                dst.write(carrier.data[offset:offset + length])
+            else:
+                copy_range(carrier.file, dst, carrier.data_offset + offset, length)
+        
+        tracker.advance(length)
+
+
+def _same_file(path, other):
+    """Whether two paths name the same existing file"""
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+def save_stego(carrier, output_path, segments, chunk_size, metrics, tracker, source=None):
+    """
+    Write a carrier with embedded data to a path or file object
+    
+    Takes the same arguments as :func:`write_stego`, with ``output_path``
+    in place of an open file. A partially written output file is removed if
+    the operation is cancelled.
+    
+    Opening the carrier's own file for writing would truncate it while it is
+    still being read, so when ``output_path`` is the same file as ``source``
+    the output goes to a temporary file next to it instead. The caller moves
+    that over the target with :func:`replace_source` once the carrier is
+    closed.
+    
+    Returns:
+        tuple: (temporary path, target path) still to be moved into place,
+        or None if the output was written directly
+    """
+    if not is_path(output_path):
+        write_stego(carrier, output_path, segments, chunk_size, metrics, tracker)
+        return None
+    
+    pending = None
+    target = output_path
+    if is_path(source) and _same_file(source, output_path):
+        real_path = os.path.realpath(output_path)
+        fd, target = tempfile.mkstemp(suffix=".wav", dir=os.path.dirname(real_path))
+        os.close(fd)
+        shutil.copymode(real_path, target)
+        pending = (target, real_path)
+    
+    try:
+        with open(target, 'wb') as dst:
+            write_stego(carrier, dst, segments, chunk_size, metrics, tracker)
+    except OperationCancelled:
+        os.remove(target)
+        raise
+    except BaseException:
+        if pending is not None:
+            os.remove(target)
+        raise
+    return pending
+
+
+def replace_source(pending):
+    """Move an output left pending by :func:`save_stego` over its target"""
+    if pending is not None:
+        os.replace(*pending)
+
+
+def read_span(carrier, header, start, stop):
+    """
+    Read bytes ``start`` to ``stop`` of the payload described by ``header``
+    
+    Args:
+        carrier (SampleBuffer): Mapped WAV file
+        header (dict): Validated payload header
+        start (int): Offset of the first payload byte
+        stop (int): Offset just past the last payload byte
+        
+    Returns:
+        bytes: The payload bytes
+    """
+    bits_per_sample = header["bits_per_sample"]
+    
+    # Reads must begin on a sample boundary, which payload offsets that are a
+    # multiple of ``unit`` bytes always do (every byte unless 3 bits/sample)
+    unit = bits_per_sample // math.gcd(8, bits_per_sample)
+    aligned = start - start % unit
+    
+    data = extract_bytes(
+        carrier.data, carrier.sampwidth, stop - aligned,
+        sample_offset=header["header_size"] * 8 + aligned * 8 // bits_per_sample,
+        bits_per_sample=bits_per_sample
+    )
+    return data[start - aligned:]
@@ -0,0 +1,55 @@
+"""
+Progress reporting and cancellation for long-running operations
+
+``hide_image`` and ``extract_image`` accept a ``progress`` callable, called
+as ``progress(done, total)`` with byte counts after every chunk, and a
+``cancel`` token: any object with an ``is_set()`` method, such as a
+``threading.Event``. The token is checked between chunks and the operation
+raises :class:`OperationCancelled` once it is set.
+"""
+
+
+class OperationCancelled(Exception):
+    """Raised when an operation is stopped through its cancel token"""
+
+
+class ProgressTracker:
+    """
+    Reports progress through a chunked loop and honours cancellation
+    
+    Args:
+        total (int): Total amount of work, in bytes
+        callback (callable, optional): Called as ``callback(done, total)``
+        cancel (object, optional): Token with an ``is_set()`` method
+    """
+    
+    def __init__(self, total, callback=None, cancel=None):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.cancel = cancel
+    
+    def check(self):
+        """
+        Stop if cancellation was requested
+        
+        Raises:
+            OperationCancelled: If the cancel token is set
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            raise OperationCancelled(f"Operation cancelled after {self.done} of {self.total} bytes")
+    
+    def advance(self, n):
+        """
+        Record ``n`` more bytes of work and report it
+        
+        Args:
+            n (int): Amount of work just completed
+            
+        Raises:
+            OperationCancelled: If the cancel token is set
+        """
+        self.done += n
+        if self.callback is not None:
+            self.callback(self.done, self.total)
+        self.check()
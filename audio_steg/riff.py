@@ -0,0 +1,212 @@
+"""
+Chunk-level RIFF/WAVE reader and writer
+
+Unlike the standard library ``wave`` module this understands 24-bit packed
+and 32-bit IEEE float samples, ``WAVE_FORMAT_EXTENSIBLE`` headers and RF64
+files larger than 4 GB. Only the chunk structure is parsed: the sample data
+stays where it is in the file, so it can be mapped and modified in place.
+"""
+
+import os
+import struct
+
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Sample encodings the library can embed into, with the sample widths in
+# bytes each supports
+SAMPLE_ENCODINGS = {
+    WAVE_FORMAT_PCM: ("pcm", (1, 2, 3, 4)),
+    WAVE_FORMAT_IEEE_FLOAT: ("float", (4,)),
+}
+
+# An EXTENSIBLE sub-format GUID is the format tag followed by this suffix
+GUID_SUFFIX = b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+
+# 32-bit sizes at this value are stored in the ``ds64`` chunk of RF64 files
+RF64_PLACEHOLDER = 0xFFFFFFFF
+
+FMT_FORMAT = '<HHIIHH'
+FMT_SIZE = struct.calcsize(FMT_FORMAT)
+DS64_FORMAT = '<QQQI'
+DS64_SIZE = struct.calcsize(DS64_FORMAT)
+
+
+def _read_exact(f, size, what):
+    """Read ``size`` bytes or raise ValueError naming what was cut short"""
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError(f"Truncated WAV file: incomplete {what}")
+    return data
+
+
+def parse_fmt(fmt_chunk):
+    """
+    Decode the payload of a ``fmt `` chunk
+    
+    Args:
+        fmt_chunk (bytes): Chunk payload
+        
+    Returns:
+        dict: ``format_tag`` (the sub-format for EXTENSIBLE headers),
+        ``encoding`` (``"pcm"`` or ``"float"``), ``n_channels``,
+        ``framerate``, ``sampwidth``, ``block_align`` and ``valid_bits``
+        
+    Raises:
+        ValueError: If the chunk is malformed or the encoding is unsupported
+    """
+    if len(fmt_chunk) < FMT_SIZE:
+        raise ValueError("Invalid WAV file: fmt chunk too short")
+    
+    format_tag, n_channels, framerate, _, block_align, bits = struct.unpack_from(FMT_FORMAT, fmt_chunk)
+    valid_bits = bits
+    
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        if len(fmt_chunk) < FMT_SIZE + 24:
+            raise ValueError("Invalid WAV file: EXTENSIBLE fmt chunk too short")
+        valid_bits, _, sub_format = struct.unpack_from('<HI16s', fmt_chunk, FMT_SIZE + 2)
+        if sub_format[2:] != GUID_SUFFIX:
+            raise ValueError("Unsupported WAV format: unknown EXTENSIBLE sub-format")
+        format_tag = struct.unpack('<H', sub_format[:2])[0]
+        valid_bits = valid_bits or bits
+    
+    if format_tag not in SAMPLE_ENCODINGS:
+        raise ValueError(f"Unsupported WAV format tag: 0x{format_tag:04x}")
+    if n_channels == 0 or block_align == 0 or block_align % n_channels:
+        raise ValueError("Invalid WAV file: bad channel count or block alignment")
+    
+    encoding, widths = SAMPLE_ENCODINGS[format_tag]
+    sampwidth = block_align // n_channels
+    if sampwidth not in widths:
+        raise ValueError(f"Unsupported sample width for {encoding} audio: {sampwidth * 8} bits")
+    
+    return {
+        "format_tag": format_tag,
+        "encoding": encoding,
+        "n_channels": n_channels,
+        "framerate": framerate,
+        "sampwidth": sampwidth,
+        "block_align": block_align,
+        "valid_bits": valid_bits,
+    }
+
+
+def read_wav_info(f):
+    """
+    Parse the chunk structure of a RIFF/WAVE or RF64 file
+    
+    Args:
+        f (file): WAV file opened in binary mode; only ``read``, ``seek`` and
+            ``tell`` are used
+            
+    Returns:
+        dict: The :func:`parse_fmt` fields plus ``rf64``, ``fmt_chunk`` (the
+        raw ``fmt `` payload), ``data_offset`` and ``data_size`` (as declared;
+        the file may be shorter) and ``n_frames``
+        
+    Raises:
+        ValueError: If the file is not a valid WAV file or has no data chunk
+    """
+    f.seek(0)
+    riff_id, _, wave_id = struct.unpack('<4sI4s', _read_exact(f, 12, "RIFF header"))
+    if riff_id not in (b'RIFF', b'RF64') or wave_id != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE file")
+    
+    rf64 = riff_id == b'RF64'
+    ds64_data_size = None
+    fmt_chunk = None
+    data = None
+    
+    while fmt_chunk is None or data is None:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            if fmt_chunk is None:
+                raise ValueError("WAV file has no fmt chunk")
+            raise ValueError("WAV file has no data chunk")
+        
+        chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+        consumed = 0
+        
+        if chunk_id == b'ds64' and rf64:
+            _, ds64_data_size, _, _ = struct.unpack(DS64_FORMAT, _read_exact(f, DS64_SIZE, "ds64 chunk"))
+            consumed = DS64_SIZE
+        elif chunk_id == b'fmt ':
+            fmt_chunk = _read_exact(f, chunk_size, "fmt chunk")
+            consumed = chunk_size
+        elif chunk_id == b'data':
+            if rf64 and chunk_size == RF64_PLACEHOLDER:
+                if ds64_data_size is None:
+                    raise ValueError("Invalid RF64 file: data chunk before ds64 chunk")
+                chunk_size = ds64_data_size
+            data = (f.tell(), chunk_size)
+            if fmt_chunk is not None:
+                break
+        
+        # Chunks are word aligned
+        f.seek(chunk_size - consumed + (chunk_size & 1), os.SEEK_CUR)
+    
+    info = parse_fmt(fmt_chunk)
+    info.update({
+        "rf64": rf64,
+        "fmt_chunk": fmt_chunk,
+        "data_offset": data[0],
+        "data_size": data[1],
+        "n_frames": data[1] // info["block_align"],
+    })
+    return info
+
+
+def write_wav_header(f, n_channels, sampwidth, framerate, data_size, fmt_chunk=None, rf64=False):
+    """
+    Write the chunks of a WAV file that precede the sample data
+    
+    Plain PCM is written as the canonical 44-byte header, laid out exactly
+    as the standard library ``wave`` module writes it, so such files are
+    byte-identical to ``wave`` output. Other formats keep their original
+    ``fmt `` chunk and gain a ``fact`` chunk. RF64 is used when the file
+    would exceed the 4 GB RIFF limit.
+    
+    Args:
+        f (file): Output file opened in binary mode
+        n_channels (int): Number of channels
+        sampwidth (int): Sample width in bytes
+        framerate (int): Sample rate in Hz
+        data_size (int): Size of the sample data that will follow, in bytes
+        fmt_chunk (bytes, optional): ``fmt `` payload of the source file, to
+            preserve float and EXTENSIBLE headers
+        rf64 (bool): Always write an RF64 file
+    """
+    if fmt_chunk is None or struct.unpack_from('<H', fmt_chunk)[0] == WAVE_FORMAT_PCM:
+        fmt_chunk = struct.pack(
+            FMT_FORMAT, WAVE_FORMAT_PCM, n_channels, framerate,
+            n_channels * framerate * sampwidth,
+            n_channels * sampwidth,
+            sampwidth * 8
+        )
+    
+    n_frames = data_size // (n_channels * sampwidth)
+    chunks = [b'fmt ' + struct.pack('<I', len(fmt_chunk)) + fmt_chunk]
+    if len(fmt_chunk) & 1:
+        chunks.append(b'\x00')
+    format_tag = struct.unpack_from('<H', fmt_chunk)[0]
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt_chunk) >= FMT_SIZE + 24:
+        format_tag = struct.unpack_from('<H', fmt_chunk, FMT_SIZE + 8)[0]
+    if format_tag != WAVE_FORMAT_PCM:
+        # Required for non-PCM data
+        chunks.append(struct.pack('<4sII', b'fact', 4, min(n_frames, RF64_PLACEHOLDER)))
+    
+    riff_size = 4 + sum(len(chunk) for chunk in chunks) + 8 + data_size
+    
+    if rf64 or riff_size >= RF64_PLACEHOLDER:
+        riff_size += 8 + DS64_SIZE
+        f.write(struct.pack('<4sI4s', b'RF64', RF64_PLACEHOLDER, b'WAVE'))
+        f.write(struct.pack('<4sI', b'ds64', DS64_SIZE))
+        f.write(struct.pack(DS64_FORMAT, riff_size, data_size, n_frames, 0))
+        f.write(b''.join(chunks))
+        f.write(struct.pack('<4sI', b'data', RF64_PLACEHOLDER))
+    else:
+        f.write(struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE'))
+        f.write(b''.join(chunks))
+        f.write(struct.pack('<4sI', b'data', data_size))
@@ -0,0 +1,140 @@
+"""
+Fast detection of WAV files that carry a hidden payload
+
+Only the WAV header and the samples holding the payload header are read, so
+checking a file costs a few page reads no matter how long the recording is.
+"""
+
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .codecs import codec_name
+from .engine import check_sample_width, extract_bytes
+from .header import (
+    EXTENDED_SIZE, LEGACY_SIZE, full_header_size, is_extended, parse_header, samples_needed,
+    validate_header
+)
+from .wavio import open_samples
+
+
+def read_header(carrier):
+    """
+    Read and decode the payload header of a mapped carrier
+    
+    Only the samples holding the header are touched.
+    
+    Args:
+        carrier (SampleBuffer): Mapped WAV file
+        
+    Returns:
+        dict: Decoded header as returned by ``parse_header``
+        
+    Raises:
+        ValueError: If the carrier is too short to hold a header
+    """
+    if carrier.n_samples < LEGACY_SIZE * 8:
+        raise ValueError("Invalid header data - no image found or corrupted data")
+    
+    header_bytes = extract_bytes(carrier.data, carrier.sampwidth, LEGACY_SIZE)
+    
+    if is_extended(header_bytes):
+        if carrier.n_samples < EXTENDED_SIZE * 8:
+            raise ValueError("Invalid header data - no image found or corrupted data")
+        header_bytes = extract_bytes(carrier.data, carrier.sampwidth, EXTENDED_SIZE)
+        
+        size = full_header_size(header_bytes)
+        if size > EXTENDED_SIZE:
+            if carrier.n_samples < size * 8:
+                raise ValueError("Invalid header data - no image found or corrupted data")
+            header_bytes = extract_bytes(carrier.data, carrier.sampwidth, size)
+    
+    return parse_header(header_bytes)
+
+
+def check_payload(carrier):
+    """
+    Read a carrier's header and check that it describes a valid payload
+    
+    Applies the same sanity checks as ``extract_image`` and also makes sure
+    the payload fits in the carrier.
+    
+    Args:
+        carrier (SampleBuffer): Mapped WAV file
+        
+    Returns:
+        dict: The decoded header
+        
+    Raises:
+        ValueError: If no valid payload header is present
+    """
+    check_sample_width(carrier.sampwidth)
+    header = read_header(carrier)
+    validate_header(header)
+    
+    samples_used = header["header_size"] * 8 + samples_needed(header["data_size"], header["bits_per_sample"])
+    if samples_used > carrier.n_samples:
+        raise ValueError(f"Not enough samples to extract image. Need {samples_used}, have {carrier.n_samples}")
+    
+    return header
+
+
+def scan_file(wav_path):
+    """
+    Check whether a single WAV file carries a payload
+    
+    Args:
+        wav_path (str): Path to the WAV file
+        
+    Returns:
+        dict: ``path`` and ``has_payload``; for files with a payload also
+        ``image_size``, ``data_bytes``, ``bits_per_sample``,
+        ``compression``, ``shard`` and ``container`` (see
+        ``parse_header``), otherwise a ``reason``
+    """
+    try:
+        with open_samples(wav_path) as carrier:
+            header = check_payload(carrier)
+    except Exception as e:
+        return {"path": wav_path, "has_payload": False, "reason": f"{type(e).__name__}: {e}"}
+    
+    return {
+        "path": wav_path,
+        "has_payload": True,
+        "image_size": (header["width"], header["height"]),
+        "data_bytes": header["data_size"],
+        "bits_per_sample": header["bits_per_sample"],
+        "compression": codec_name(header["codec"]),
+        "shard": header["shard"],
+        "container": header["container"]
+    }
+
+
+def scan_directory(directory, pattern="*.wav", recursive=False, workers=None):
+    """
+    Detect which WAV files in a directory carry a payload
+    
+    Files are checked concurrently on a thread pool since the work is
+    dominated by I/O.
+    
+    Args:
+        directory (str): Directory to scan
+        pattern (str): Glob pattern for file names
+        recursive (bool): Also scan subdirectories
+        workers (int, optional): Number of threads
+        
+    Returns:
+        list: One :func:`scan_file` result per file, sorted by path
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Directory not found: {directory}")
+    
+    if recursive:
+        paths = glob.glob(os.path.join(glob.escape(directory), "**", pattern), recursive=True)
+    else:
+        paths = glob.glob(os.path.join(glob.escape(directory), pattern))
+    paths = sorted(path for path in paths if os.path.isfile(path))
+    
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(scan_file, paths))
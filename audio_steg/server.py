@@ -0,0 +1,358 @@
+"""
+Local HTTP daemon serving hide, extract, capacity and scan requests
+
+Running ``steg`` once per request pays interpreter startup and the Pillow
+import every time. The daemon pays them once: it listens on a TCP port or a
+Unix socket and hands requests to a pool of worker processes that are
+started and warmed up before the first request arrives.
+
+Every endpoint takes ``POST`` and accepts either a JSON body of file paths,
+for callers on the same machine, or the file contents themselves:
+
+- ``/hide``: JSON ``{"audio", "image", "output"}`` returns the result dict;
+  a ``multipart/form-data`` body with ``audio`` and ``image`` parts returns
+  the output WAV file
+- ``/extract``: JSON ``{"audio", "output"}`` returns the result dict; a WAV
+  body returns the image, encoded as ``?format=`` (PNG by default).
+  ``name`` selects a payload of a container
+- ``/capacity``: JSON ``{"audio"}`` or a WAV body returns the capacity dict
+- ``/scan``: JSON ``{"directory"}`` returns one result per WAV file
+
+Options such as ``bits_per_sample``, ``compression`` or ``recursive`` go in
+the query string or, for JSON requests, in the body. ``GET /health``
+reports that the daemon is up. Errors are returned as ``{"error": ...}``
+with status 400 for invalid input, 404 for missing files and 500 otherwise.
+"""
+
+import json
+import os
+import socketserver
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from . import __version__
+from .core import extract_image, extract_image_bytes, hide_image, hide_image_bytes
+from .scan import scan_directory
+from .capacity import get_audio_capacity
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Converters for options given in the query string or JSON body
+OPTION_TYPES = {
+    "auto_resize": lambda value: value if isinstance(value, bool) else value.lower() in ("1", "true", "yes"),
+    "bits_per_sample": int,
+    "chunk_size": int,
+    "compression": str,
+    "format": str,
+    "name": str,
+    "pattern": str,
+    "recursive": lambda value: value if isinstance(value, bool) else value.lower() in ("1", "true", "yes"),
+}
+
+# Options each endpoint passes on to the library
+ENDPOINT_OPTIONS = {
+    "/hide": ("auto_resize", "bits_per_sample", "chunk_size", "compression"),
+    "/extract": ("format", "name"),
+    "/capacity": ("bits_per_sample",),
+    "/scan": ("pattern", "recursive"),
+}
+
+
+def _warm_worker():
+    """Touch the imaging and engine code paths once so the first job is fast"""
+    from PIL import Image
+    
+    Image.new('RGB', (1, 1)).tobytes()
+
+
+def _ping():
+    """No-op job used to start every worker before requests arrive"""
+    return os.getpid()
+
+
+def start_workers(workers):
+    """
+    Start a pool of warmed-up worker processes
+    
+    Args:
+        workers (int): Number of worker processes
+        
+    Returns:
+        ProcessPoolExecutor: The running pool
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+    
+    # Workers are otherwise started lazily, on the first requests
+    futures = [executor.submit(_ping) for _ in range(workers)]
+    for future in futures:
+        future.result()
+    
+    return executor
+
+
+class _WorkerPoolMixin:
+    """Runs jobs on the server's worker pool, or inline when it has none"""
+    
+    daemon_threads = True
+    executor = None
+    quiet = False
+    
+    def run(self, func, *args, **kwargs):
+        """Run ``func`` in a worker and return its result"""
+        if self.executor is None:
+            return func(*args, **kwargs)
+        return self.executor.submit(func, *args, **kwargs).result()
+
+
+class StegServer(_WorkerPoolMixin, ThreadingHTTPServer):
+    """
+    Threaded HTTP server on a TCP port
+    
+    Args:
+        address (tuple): (host, port) to listen on
+        executor (concurrent.futures.Executor, optional): Pool jobs run in;
+            without one they run in the request threads
+    """
+    
+    def __init__(self, address, executor=None):
+        self.executor = executor
+        super().__init__(address, StegRequestHandler)
+
+
+class UnixStegServer(_WorkerPoolMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Threaded HTTP server on a Unix socket
+    
+    Args:
+        path (str): Socket path; a stale socket file is replaced
+        executor (concurrent.futures.Executor, optional): Pool jobs run in
+    """
+    
+    def __init__(self, path, executor=None):
+        self.executor = executor
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, StegRequestHandler)
+    
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class StegRequestHandler(BaseHTTPRequestHandler):
+    """Handles one connection to the daemon"""
+    
+    server_version = f"steg/{__version__}"
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self._send_json({"status": "ok", "pid": os.getpid()})
+        else:
+            self._send_json({"error": f"Not found: {self.path}"}, 404)
+    
+    def do_POST(self):
+        url = urlsplit(self.path)
+        handler = {
+            "/hide": self._hide,
+            "/extract": self._extract,
+            "/capacity": self._capacity,
+            "/scan": self._scan,
+        }.get(url.path)
+        
+        if handler is None:
+            self._read_body()
+            self._send_json({"error": f"Not found: {url.path}"}, 404)
+            return
+        
+        try:
+            body = self._read_body()
+            content_type = self.headers.get("Content-Type", "")
+            
+            fields = None
+            if content_type.startswith("application/json"):
+                fields = json.loads(body or b"{}")
+                if not isinstance(fields, dict):
+                    raise ValueError("JSON body must be an object")
+            
+            options = dict(parse_qsl(url.query))
+            options.update(fields or {})
+            options = {
+                key: OPTION_TYPES[key](options[key])
+                for key in ENDPOINT_OPTIONS[url.path] if options.get(key) is not None
+            }
+            
+            handler(fields, body, content_type, options)
+        except (ValueError, KeyError) as e:
+            self._send_json({"error": f"{type(e).__name__}: {e}"}, 400)
+        except FileNotFoundError as e:
+            self._send_json({"error": str(e)}, 404)
+        except Exception as e:
+            self._send_json({"error": f"{type(e).__name__}: {e}"}, 500)
+    
+    def _hide(self, fields, body, content_type, options):
+        if fields is not None:
+            result = self.server.run(
+                hide_image, fields["audio"], fields["image"], fields["output"], verbose=False, **options
+            )
+            self._send_json(result)
+            return
+        
+        parts = _parse_multipart(content_type, body)
+        stego = self.server.run(hide_image_bytes, parts["audio"], parts["image"], **options)
+        self._send_bytes(stego, "audio/wav")
+    
+    def _extract(self, fields, body, content_type, options):
+        if fields is not None:
+            options.pop("format", None)
+            result = self.server.run(extract_image, fields["audio"], fields["output"], verbose=False, **options)
+            self._send_json(result)
+            return
+        
+        image_format = options.get("format", "PNG")
+        image = self.server.run(extract_image_bytes, body, image_format, name=options.get("name"))
+        self._send_bytes(image, f"image/{image_format.lower()}")
+    
+    def _capacity(self, fields, body, content_type, options):
+        # Only the header is read, so this stays in the request thread
+        source = fields["audio"] if fields is not None else body
+        self._send_json(get_audio_capacity(source, **options))
+    
+    def _scan(self, fields, body, content_type, options):
+        if fields is None:
+            raise ValueError("/scan takes a JSON body with a 'directory'")
+        self._send_json(scan_directory(fields["directory"], **options))
+    
+    def _read_body(self):
+        """
+        Read the request body into one preallocated buffer
+        
+        Jobs run in the request thread view the buffer in place; a worker
+        pool is sent a pickled copy of it.
+        """
+        length = self.headers.get("Content-Length")
+        if length is None:
+            return b""
+        
+        body = bytearray(int(length))
+        view = memoryview(body)
+        received = 0
+        while received < len(body):
+            n = self.rfile.readinto(view[received:])
+            if not n:
+                raise ValueError("Request body ended early")
+            received += n
+        return body
+    
+    def _send_bytes(self, data, content_type, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if status >= 400:
+            # The request body may not have been read in full
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_json(self, payload, status=200):
+        self._send_bytes(json.dumps(payload).encode("utf-8"), "application/json", status)
+    
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+    
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def _parse_multipart(content_type, body):
+    """
+    Split a ``multipart/form-data`` body into its named parts
+    
+    Args:
+        content_type (str): Content-Type header, including the boundary
+        body (bytes): Request body
+        
+    Returns:
+        dict: Part name to contents
+        
+    Raises:
+        ValueError: If the body is not multipart
+    """
+    if not content_type.startswith("multipart/form-data"):
+        raise ValueError("Expected a JSON or multipart/form-data body")
+    
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + bytes(body)
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.iter_parts()
+    }
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, workers=None, quiet=False):
+    """
+    Create a daemon with a warmed-up worker pool
+    
+    Args:
+        host (str): Address to listen on
+        port (int): TCP port; 0 picks a free one
+        socket_path (str, optional): Listen on this Unix socket instead
+        workers (int, optional): Worker processes; defaults to the CPU count.
+            With 0 jobs run in the request threads
+        quiet (bool): Do not log requests
+        
+    Returns:
+        StegServer or UnixStegServer: The server; call ``serve_forever()``
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = start_workers(workers) if workers > 0 else None
+    
+    try:
+        if socket_path:
+            server = UnixStegServer(socket_path, executor)
+        else:
+            server = StegServer((host, port), executor)
+    except Exception:
+        if executor is not None:
+            executor.shutdown()
+        raise
+    
+    server.quiet = quiet
+    return server
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, workers=None, quiet=False, ready=None):
+    """
+    Run the daemon until interrupted
+    
+    Args:
+        host (str): Address to listen on
+        port (int): TCP port
+        socket_path (str, optional): Listen on this Unix socket instead
+        workers (int, optional): Worker processes; defaults to the CPU count
+        quiet (bool): Do not log requests
+        ready (callable, optional): Called with the server once it is
+            listening, before the first request is handled
+    """
+    server = create_server(host, port, socket_path, workers, quiet)
+    try:
+        if ready is not None:
+            ready(server)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if server.executor is not None:
+            server.executor.shutdown()
@@ -0,0 +1,347 @@
+"""
+Sharding: one image split across several carriers
+
+An image too large for one WAV file can be hidden at full resolution across
+several. The encoded payload is cut into one shard per carrier, sized in
+proportion to each carrier's capacity. Every shard's header is flagged as
+sharded and records a random payload ID, the shard's index, the shard count
+and the size of the whole payload, so the shards can be collected in any
+order and put back together. Shards are embedded and extracted in parallel,
+one per worker process.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .codecs import codec_id, codec_name
+from .engine import check_sample_width
+from .header import (
+    MAX_SHARDS, check_bits_per_sample, check_dimensions, pack_header, payload_capacity, samples_needed
+)
+from .payload import (
+    DEFAULT_CHUNK_SIZE, decode_payload, describe, encode_payload, open_image, read_span, replace_source, save_stego
+)
+from .scan import check_payload
+from .wavio import open_samples
+
+
+def plan_shards(size, capacities):
+    """
+    Split a payload into one shard per carrier
+    
+    Shards are proportional to the carriers' capacities, so every carrier is
+    filled to about the same fraction and takes about the same time.
+    
+    Args:
+        size (int): Payload size in bytes
+        capacities (list): Payload capacity of each carrier in bytes
+        
+    Returns:
+        list: Shard sizes in bytes, in carrier order
+        
+    Raises:
+        ValueError: If a carrier holds no data at all, the payload does not
+            fit, or it is too small to give every carrier at least one byte
+    """
+    empty = [index + 1 for index, capacity in enumerate(capacities) if capacity <= 0]
+    if empty:
+        raise ValueError(
+            f"Carrier(s) {', '.join(map(str, empty))} of {len(capacities)} too short to hold any data"
+        )
+    
+    total = sum(capacities)
+    if size > total:
+        raise ValueError(
+            f"Image too large! Need {size} bytes but the {len(capacities)} carriers "
+            f"only hold {total}."
+        )
+    
+    bounds = [0]
+    filled = 0
+    for capacity in capacities:
+        filled += capacity
+        bounds.append(size * filled // total)
+    
+    sizes = [stop - start for start, stop in zip(bounds, bounds[1:])]
+    if not all(sizes):
+        raise ValueError(f"A {size}-byte payload is too small to split across {len(capacities)} carriers")
+    return sizes
+
+
+def _embed_shard(task):
+    """
+    Write one shard into its carrier, in a worker process
+    
+    Args:
+        task (tuple): (wav_path, output_path, header, data, bits_per_sample,
+            chunk_size)
+            
+    Returns:
+        dict: ``output_file``, ``data_bytes`` and ``capacity_usage``
+    """
+    wav_path, output_path, header, data, bits_per_sample, chunk_size = task
+    header_samples = len(header) * 8
+    segments = [(0, header, 1), (header_samples, data, bits_per_sample)]
+    
+    with open_samples(wav_path) as carrier:
+        pending = save_stego(carrier, output_path, segments, chunk_size, None, None, source=wav_path)
+        samples_used = header_samples + samples_needed(len(data), bits_per_sample)
+        usage = samples_used / carrier.n_samples * 100
+    replace_source(pending)
+    
+    return {"output_file": output_path, "data_bytes": len(data), "capacity_usage": usage}
+
+
+def _run(func, tasks, workers):
+    """Map ``func`` over ``tasks`` on a process pool, or inline for one worker"""
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [func(task) for task in tasks]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, tasks))
+
+
+def hide_image_sharded(wav_paths, image_path, output_paths, verbose=True, bits_per_sample=1,
+                       compression=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Hide one image across several WAV files
+    
+    Args:
+        wav_paths (list): Paths to the carrier WAV files
+        image_path (str, bytes, file or PIL.Image): Image to hide, as for
+            :func:`~audio_steg.core.hide_image`
+        output_paths (list): Output WAV path for each carrier
+        verbose (bool): Print progress information
+        bits_per_sample (int): Number of LSBs of each sample that carry data
+        compression (str, optional): Codec to embed the image with, see
+            :func:`~audio_steg.core.hide_image`
+        chunk_size (int): Number of samples processed per chunk
+        workers (int, optional): Number of worker processes; defaults to the
+            CPU count. With 1 the shards are written in the calling process
+            
+    Returns:
+        dict: ``success``, ``image_size``, ``data_bytes``,
+        ``bits_per_sample``, ``compression``, the hex ``payload_id`` and
+        ``shards``, one dict per carrier with ``output_file``,
+        ``data_bytes`` and ``capacity_usage``
+        
+    Raises:
+        ValueError: If the carriers cannot hold the image, or it is larger
+            than extraction accepts
+    """
+    if len(wav_paths) != len(output_paths):
+        raise ValueError(f"Got {len(wav_paths)} carriers but {len(output_paths)} output paths")
+    if not 1 <= len(wav_paths) <= MAX_SHARDS:
+        raise ValueError(f"Need between 1 and {MAX_SHARDS} carriers, got {len(wav_paths)}")
+    
+    codec = codec_id(compression)
+    compression = codec_name(codec)
+    
+    capacities = []
+    for wav_path in wav_paths:
+        with open_samples(wav_path) as carrier:
+            check_sample_width(carrier.sampwidth)
+            check_bits_per_sample(bits_per_sample, carrier.sampwidth)
+            capacities.append(max(0, payload_capacity(carrier.n_samples, bits_per_sample, codec, sharded=True)))
+    
+    if verbose:
+        print(f"[*] {len(wav_paths)} carriers hold {sum(capacities)} bytes")
+        print(f"[*] Opening image: {describe(image_path)}")
+    
+    img, source = open_image(image_path)
+    source_format = img.format
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    width, height = img.size
+    check_dimensions(width, height)
+    data = encode_payload(img, compression, source=source, source_format=source_format)
+    
+    if verbose:
+        print(f"[*] Image size: {width}x{height} pixels, {len(data)} bytes to embed")
+    
+    sizes = plan_shards(len(data), capacities)
+    payload_id = os.urandom(8)
+    
+    tasks = []
+    offset = 0
+    for index, (wav_path, output_path, size) in enumerate(zip(wav_paths, output_paths, sizes)):
+        shard = {"payload_id": payload_id, "index": index, "count": len(sizes), "total_size": len(data)}
+        header = pack_header(width, height, size, bits_per_sample, codec, shard=shard)
+        tasks.append((wav_path, output_path, header, data[offset:offset + size], bits_per_sample, chunk_size))
+        offset += size
+    
+    if verbose:
+        print(f"[*] Embedding {len(tasks)} shards of payload {payload_id.hex()}...")
+    
+    shards = _run(_embed_shard, tasks, workers)
+    
+    if verbose:
+        for shard in shards:
+            print(f"[+] {shard['output_file']}: {shard['data_bytes']} bytes, {shard['capacity_usage']:.2f}% used")
+    
+    return {
+        "success": True,
+        "image_size": (width, height),
+        "data_bytes": len(data),
+        "bits_per_sample": bits_per_sample,
+        "compression": compression,
+        "payload_id": payload_id.hex(),
+        "shards": shards
+    }
+
+
+def _read_shard_header(wav_path):
+    """
+    Read the header of a carrier expected to hold a shard
+    
+    Returns:
+        dict: The validated header
+        
+    Raises:
+        ValueError: If the file holds no payload or a whole one
+    """
+    with open_samples(wav_path) as carrier:
+        header = check_payload(carrier)
+    if header["shard"] is None:
+        raise ValueError(f"{wav_path} does not hold a shard")
+    return header
+
+
+def _try_read_shard_header(wav_path):
+    """Like :func:`_read_shard_header`, but None for files that are not shards"""
+    try:
+        return _read_shard_header(wav_path)
+    except Exception:
+        return None
+
+
+def _extract_shard(wav_path):
+    """Read the shard data of one carrier, in a worker process"""
+    with open_samples(wav_path) as carrier:
+        header = check_payload(carrier)
+        return read_span(carrier, header, 0, header["data_size"])
+
+
+def find_shards(sources, payload_id=None):
+    """
+    Collect the shards of one payload
+    
+    Args:
+        sources (str or list): Directory to search for ``*.wav`` files, or
+            a list of WAV paths in any order
+        payload_id (str, optional): Hex ID of the payload to collect; needed
+            only when the sources hold shards of several payloads. Files
+            holding other payloads are then ignored
+            
+    Returns:
+        list: (path, header) pairs in shard order
+        
+    Raises:
+        ValueError: If shards are missing, duplicated or inconsistent, or
+            the payload is ambiguous
+    """
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        if isinstance(sources, (str, os.PathLike)):
+            # A directory may hold unrelated files; those are skipped
+            paths = sorted(glob.glob(os.path.join(glob.escape(os.fspath(sources)), "*.wav")))
+            headers = list(executor.map(_try_read_shard_header, paths))
+        else:
+            paths = list(sources)
+            headers = list(executor.map(_read_shard_header, paths))
+    
+    payloads = {}
+    for path, header in zip(paths, headers):
+        if header is not None:
+            payloads.setdefault(header["shard"]["payload_id"], []).append((path, header))
+    
+    if payload_id is not None:
+        found = payloads.get(payload_id.lower())
+        if found is None:
+            raise ValueError(f"No shards of payload {payload_id} found")
+    elif len(payloads) == 1:
+        found, = payloads.values()
+    elif not payloads:
+        raise ValueError("No shards found")
+    else:
+        raise ValueError(f"Shards of several payloads found, choose one of: {', '.join(sorted(payloads))}")
+    
+    first = found[0][1]
+    count = first["shard"]["count"]
+    by_index = {}
+    for path, header in found:
+        shard = header["shard"]
+        if (shard["count"], shard["total_size"], header["width"], header["height"], header["codec"]) != (
+                count, first["shard"]["total_size"], first["width"], first["height"], first["codec"]):
+            raise ValueError(f"{path} does not match the other shards - possibly corrupted data")
+        if shard["index"] in by_index:
+            raise ValueError(f"Shard {shard['index'] + 1} found twice: {by_index[shard['index']][0]} and {path}")
+        by_index[shard["index"]] = (path, header)
+    
+    missing = [index + 1 for index in range(count) if index not in by_index]
+    if missing:
+        raise ValueError(f"Missing shard(s) {', '.join(map(str, missing))} of {count}")
+    
+    return [by_index[index] for index in range(count)]
+
+
+def extract_image_sharded(sources, output_image_path, verbose=True, payload_id=None, workers=None):
+    """
+    Reassemble and extract an image hidden across several WAV files
+    
+    Args:
+        sources (str or list): Directory holding the shards, or a list of
+            their paths in any order
+        output_image_path (str): Path where the extracted image will be saved
+        verbose (bool): Print progress information
+        payload_id (str, optional): Hex ID of the payload, see
+            :func:`find_shards`
+        workers (int, optional): Number of worker processes; defaults to the
+            CPU count
+            
+    Returns:
+        dict: ``success``, ``image_size``, ``data_bytes``,
+        ``bits_per_sample``, ``compression``, ``payload_id``, ``shards``
+        (the carrier paths in shard order) and ``output_file``
+        
+    Raises:
+        ValueError: If the shards are incomplete or do not decode
+    """
+    shards = find_shards(sources, payload_id)
+    first = shards[0][1]
+    paths = [path for path, _ in shards]
+    
+    if verbose:
+        print(f"[*] Found {len(shards)} shards of payload {first['shard']['payload_id']}")
+        print("[*] Extracting shards...")
+    
+    data = b''.join(_run(_extract_shard, paths, workers))
+    if len(data) != first["shard"]["total_size"]:
+        raise ValueError(
+            f"Shards hold {len(data)} bytes but the payload has {first['shard']['total_size']} - "
+            "possibly corrupted data"
+        )
+    
+    compression = codec_name(first["codec"])
+    width, height = first["width"], first["height"]
+    img = decode_payload(data, compression, width, height)
+    
+    if verbose:
+        print(f"[*] Saving extracted image to: {output_image_path}")
+    img.save(output_image_path)
+    
+    if verbose:
+        print(f"[+] Image successfully extracted from {len(shards)} shards!")
+        print(f"[+] Image size: {width}x{height} pixels")
+    
+    return {
+        "success": True,
+        "image_size": (width, height),
+        "data_bytes": len(data),
+        "bits_per_sample": first["bits_per_sample"],
+        "compression": compression,
+        "payload_id": first["shard"]["payload_id"],
+        "shards": paths,
+        "output_file": output_image_path
+    }
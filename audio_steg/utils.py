@@ -2,47 +2,116 @@
 Utility functions for audio steganography
 """
 
-import wave
 import struct
 import math
 from PIL import Image
 import os
 
+from .capacity import get_audio_capacity
+from .compare import compare_pixels
 
-def get_audio_capacity(wav_path):
+
+# Reductions larger than this factor start with a fast block-averaging pass
+RESIZE_REDUCING_GAP = 2.0
+
+
+def plan_resize(size, max_bytes, keep_aspect=True, compression_ratio=1.0, max_side=None):
     """
-    Get the data capacity of a WAV file in bytes
+    Find the largest dimensions whose payload fits a byte budget
+    
+    With ``keep_aspect`` both sides are scaled by the same factor, rounded
+    down, and the largest such factor that fits is used. Otherwise the
+    height is scaled and the width then fills as much of the budget as the
+    original width allows. The dimensions are computed directly from the
+    budget, so the cost does not depend on the image size.
     
     Args:
-        wav_path (str): Path to the WAV file
+        size (tuple): (width, height) of the original image
+        max_bytes (int): Bytes available for the image data
+        keep_aspect (bool): Preserve the aspect ratio
+        compression_ratio (float): Expected size of the embedded data
+            relative to the raw RGB pixels, e.g. from a previous attempt
+        max_side (int, optional): Largest width or height allowed; a longer
+            image is first scaled down to it, keeping the aspect ratio
+            
+    Returns:
+        tuple: (width, height), never larger than ``size``
         
+    Raises:
+        ValueError: If not even a single pixel fits
+    """
+    if max_side is not None and max(size) > max_side:
+        long_side = max(size)
+        size = tuple(max(1, side * max_side // long_side) for side in size)
+    
+    orig_width, orig_height = size
+    max_pixels = int(max_bytes / (3 * compression_ratio))
+    
+    if orig_width * orig_height <= max_pixels:
+        return orig_width, orig_height
+    if max_pixels < 1:
+        raise ValueError(f"Not even one pixel fits in {max_bytes:,} bytes")
+    
+    scale = math.sqrt(max_pixels / (orig_width * orig_height))
+    
+    if not keep_aspect:
+        height = max(1, min(orig_height, int(orig_height * scale)))
+        width = min(orig_width, max_pixels // height)
+        return width, height
+    
+    # Both sides are floor(side * s) for a common scale s. For each value of
+    # the short side, s spans [short / S, (short + 1) / S), which bounds the
+    # long side; only the two values nearest the continuous optimum can be
+    # the best fit
+    long_side, short_side = max(size), min(size)
+    best = (min(long_side, max_pixels), 1)
+    for short in (int(short_side * scale) + 1, int(short_side * scale)):
+        if not 1 <= short <= short_side:
+            continue
+        lowest = long_side * short // short_side
+        longest = min(long_side, max_pixels // short, (long_side * (short + 1) - 1) // short_side)
+        if longest >= max(lowest, 1):
+            best = (longest, short)
+            break
+    
+    # Otherwise the aspect ratio is too extreme for even a one-pixel short side
+    long_px, short_px = best
+    return (long_px, short_px) if orig_width >= orig_height else (short_px, long_px)
+
+
+def downscale(img, size, draft=False):
+    """
+    Resize an image to RGB at the given size as cheaply as possible
+    
+    With ``draft``, JPEG images that are not loaded yet are decoded at a
+    reduced scale (``Image.draft``). Large reductions are done by block
+    averaging (``reducing_gap``) before the final LANCZOS pass.
+    
+    Args:
+        img (PIL.Image): Input image
+        size (tuple): Target (width, height)
+        draft (bool): Allow decoding at a reduced scale. This changes
+            ``img`` itself, so only use it on images opened for this call
+            
     Returns:
-        dict: Information about audio capacity including samples and bytes
+        PIL.Image: The resized RGB image
     """
-    with wave.open(wav_path, 'rb') as wav:
-        n_frames = wav.getnframes()
-        sampwidth = wav.getsampwidth()
-        n_channels = wav.getnchannels()
-        framerate = wav.getframerate()
-        
-        samples = n_frames * n_channels
-        
-        # Each sample can hold 1 bit, so capacity in bytes is samples / 8
-        # Subtract 12 bytes for header (width, height, size)
-        capacity_bytes = (samples // 8) - 12
-        
-        return {
-            "samples": samples,
-            "capacity_bytes": capacity_bytes,
-            "capacity_kb": capacity_bytes / 1024,
-            "duration_seconds": n_frames / framerate,
-            "sample_rate": framerate,
-            "channels": n_channels,
-            "sample_width": sampwidth
-        }
+    if img.size == tuple(size):
+        return img if img.mode == 'RGB' else img.convert('RGB')
+    
+    # Only has an effect before the image is loaded; keeps the decoded size
+    # at or above the target
+    if draft:
+        img.draft('RGB', size)
+    
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=RESIZE_REDUCING_GAP)
 
 
-def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=None, verbose=True):
+def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=None, verbose=True,
+                           bits_per_sample=1, keep_aspect=True):
     """
     Resize an image to fit within audio capacity
     
@@ -52,7 +121,11 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
         wav_path (str, optional): Path to WAV file to check capacity
         max_bytes (int, optional): Maximum bytes for image data
         verbose (bool): Print progress information
-        
+        bits_per_sample (int): LSBs per sample the image will be hidden
+            with; used with wav_path to compute the capacity
+        keep_aspect (bool): Preserve the aspect ratio; when False the
+            budget is filled more completely
+            
     Returns:
         dict: Information about the resized image
         
@@ -64,7 +137,7 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
     
     # Get capacity from WAV file if provided
     if wav_path is not None:
-        capacity_info = get_audio_capacity(wav_path)
+        capacity_info = get_audio_capacity(wav_path, bits_per_sample=bits_per_sample)
         max_bytes = capacity_info["capacity_bytes"]
         
         if verbose:
@@ -75,9 +148,6 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
     
     img = Image.open(image_path)
     
-    if img.mode != 'RGB':
-        img = img.convert('RGB')
-    
     orig_width, orig_height = img.size
     orig_size = orig_width * orig_height * 3
     
@@ -89,6 +159,8 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
     if orig_size <= max_bytes:
         if verbose:
             print(f"[*] Image already fits! Copying to {output_path}")
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
         img.save(output_path)
         return {
             "resized": False,
@@ -99,21 +171,7 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
             "output_file": output_path
         }
     
-    # Calculate maximum dimensions
-    max_pixels = max_bytes // 3
-    
-    # Maintain aspect ratio
-    aspect_ratio = orig_width / orig_height
-    
-    # Calculate new dimensions
-    new_height = int(math.sqrt(max_pixels / aspect_ratio))
-    new_width = int(new_height * aspect_ratio)
-    
-    # Make sure we're under the limit
-    while (new_width * new_height * 3) > max_bytes:
-        new_width -= 1
-        new_height = int(new_width / aspect_ratio)
-    
+    new_width, new_height = plan_resize(img.size, max_bytes, keep_aspect=keep_aspect)
     new_size = new_width * new_height * 3
     
     if verbose:
@@ -122,7 +180,7 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
         print(f"[*] Size reduction: {((orig_size - new_size) / orig_size * 100):.1f}%")
     
     # Resize image
-    resized_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    resized_img = downscale(img, (new_width, new_height), draft=True)
     resized_img.save(output_path)
     
     if verbose:
@@ -139,7 +197,8 @@ def resize_image_for_audio(image_path, output_path, wav_path=None, max_bytes=Non
     }
 
 
-def resize_image_obj(img, max_bytes, verbose=True):
+def resize_image_obj(img, max_bytes, verbose=True, keep_aspect=True, compression_ratio=1.0, draft=False,
+                     max_side=None):
     """
     Resize a PIL Image object to fit within byte capacity
     
@@ -147,54 +206,53 @@ def resize_image_obj(img, max_bytes, verbose=True):
         img (PIL.Image): Input Image object
         max_bytes (int): Maximum bytes for image data
         verbose (bool): Print progress information
-        
+        keep_aspect (bool): Preserve the aspect ratio
+        compression_ratio (float): Expected size of the embedded data
+            relative to the raw RGB pixels
+        draft (bool): Allow decoding at a reduced scale, see
+            :func:`downscale`
+        max_side (int, optional): Largest width or height allowed, see
+            :func:`plan_resize`
+            
     Returns:
-        PIL.Image: Resized Image object
+        PIL.Image: Resized RGB Image object
     """
-    if img.mode != 'RGB':
-        img = img.convert('RGB')
-    
     orig_width, orig_height = img.size
     orig_size = orig_width * orig_height * 3
     
-    if orig_size <= max_bytes:
-        return img
+    new_width, new_height = plan_resize(img.size, max_bytes, keep_aspect, compression_ratio, max_side)
+    if (new_width, new_height) == img.size:
+        return img if img.mode == 'RGB' else img.convert('RGB')
     
     if verbose:
-        print(f"[*] Image too large ({orig_size:,} bytes). Auto-resizing to fit {max_bytes:,} bytes...")
-    
-    # Calculate maximum dimensions
-    max_pixels = max_bytes // 3
+        if max_side is not None and max(img.size) > max_side:
+            print(f"[*] Image larger than {max_side}x{max_side} pixels. Auto-resizing...")
+        else:
+            print(f"[*] Image too large ({orig_size:,} bytes). Auto-resizing to fit {max_bytes:,} bytes...")
     
-    # Maintain aspect ratio
-    aspect_ratio = orig_width / orig_height
-    
-    # Calculate new dimensions
-    new_height = int(math.sqrt(max_pixels / aspect_ratio))
-    new_width = int(new_height * aspect_ratio)
-    
-    # Make sure we're under the limit
-    while (new_width * new_height * 3) > max_bytes:
-        new_width -= 1
-        new_height = int(new_width / aspect_ratio)
+    img = downscale(img, (new_width, new_height), draft=draft)
     
     if verbose:
         print(f"[*] Resized to: {new_width}x{new_height} pixels")
     
-    return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return img
 
 
 def compare_images(img1_path, img2_path, verbose=True):
     """
     Compare two images pixel by pixel
     
+    The images are compared in bounded-memory strips on their raw pixel
+    data (see :mod:`audio_steg.compare`).
+    
     Args:
         img1_path (str): Path to first image
         img2_path (str): Path to second image
         verbose (bool): Print comparison details
         
     Returns:
-        dict: Comparison results including similarity percentage
+        dict: Comparison results including similarity percentage, per-channel
+        errors, PSNR and a heatmap of where the images differ
     """
     if not os.path.exists(img1_path):
         raise FileNotFoundError(f"Image not found: {img1_path}")
@@ -202,60 +260,35 @@ def compare_images(img1_path, img2_path, verbose=True):
     if not os.path.exists(img2_path):
         raise FileNotFoundError(f"Image not found: {img2_path}")
     
-    # Open images
-    img1 = Image.open(img1_path)
-    img2 = Image.open(img2_path)
-    
     # Get file sizes
     size1 = os.path.getsize(img1_path)
     size2 = os.path.getsize(img2_path)
     
-    if verbose:
-        print(f"[*] Image 1: {img1.size[0]}x{img1.size[1]} pixels, {img1.mode}, {size1:,} bytes")
-        print(f"[*] Image 2: {img2.size[0]}x{img2.size[1]} pixels, {img2.mode}, {size2:,} bytes")
-    
-    # Compare dimensions
-    if img1.size != img2.size:
-        if verbose:
-            print("❌ Images have different dimensions!")
-        return {
-            "identical": False,
-            "similarity": 0.0,
-            "reason": "Different dimensions"
-        }
-    
-    # Convert to RGB if needed
-    if img1.mode != 'RGB':
-        img1 = img1.convert('RGB')
-    if img2.mode != 'RGB':
-        img2 = img2.convert('RGB')
-    
-    # Compare pixel by pixel
-    pixels1 = list(img1.getdata())
-    pixels2 = list(img2.getdata())
-    
-    if pixels1 == pixels2:
+    with Image.open(img1_path) as img1, Image.open(img2_path) as img2:
         if verbose:
-            print("✅ Images are pixel-perfect identical!")
-        return {
-            "identical": True,
-            "similarity": 100.0,
-            "different_pixels": 0,
-            "total_pixels": len(pixels1)
-        }
-    else:
-        # Count differences
-        differences = sum(1 for p1, p2 in zip(pixels1, pixels2) if p1 != p2)
-        total_pixels = len(pixels1)
-        similarity = ((total_pixels - differences) / total_pixels) * 100
+            print(f"[*] Image 1: {img1.size[0]}x{img1.size[1]} pixels, {img1.mode}, {size1:,} bytes")
+            print(f"[*] Image 2: {img2.size[0]}x{img2.size[1]} pixels, {img2.mode}, {size2:,} bytes")
         
-        if verbose:
-            print(f"⚠️  Images are {similarity:.2f}% similar")
-            print(f"   Different pixels: {differences:,} out of {total_pixels:,}")
+        # Compare dimensions
+        if img1.size != img2.size:
+            if verbose:
+                print("❌ Images have different dimensions!")
+            return {
+                "identical": False,
+                "similarity": 0.0,
+                "reason": "Different dimensions"
+            }
         
-        return {
-            "identical": False,
-            "similarity": similarity,
-            "different_pixels": differences,
-            "total_pixels": total_pixels
-        }
+        result = compare_pixels(img1, img2)
+    
+    if verbose:
+        if result["identical"]:
+            print("✅ Images are pixel-perfect identical!")
+        else:
+            print(f"⚠️  Images are {result['similarity']:.2f}% similar")
+            print(f"   Different pixels: {result['different_pixels']:,} out of {result['total_pixels']:,}")
+            print(f"   Max abs error (R, G, B): {tuple(result['max_abs_error'])}")
+            print(f"   Mean abs error (R, G, B): ({', '.join(f'{e:.3f}' for e in result['mean_abs_error'])})")
+            print(f"   PSNR: {result['psnr']:.2f} dB")
+    
+    return result
@@ -0,0 +1,304 @@
+"""
+Low-level WAV file helpers: zero-copy sample access and streaming I/O
+"""
+
+import io
+import mmap
+import os
+import threading
+
+from .cache import get_cache
+from .riff import read_wav_info
+
+# Size of the buffer used when copying untouched sample data
+COPY_BUFFER_SIZE = 1 << 20
+
+# Typed memoryview formats by sample encoding and width; 24-bit samples have
+# no native type
+SAMPLE_FORMATS = {("pcm", 1): 'B', ("pcm", 2): 'h', ("pcm", 4): 'i', ("float", 4): 'f'}
+
+
+def copy_range(src, dst, offset, length):
+    """
+    Copy ``length`` bytes starting at ``offset`` in ``src`` to the end of ``dst``
+
+    Uses ``os.copy_file_range`` so the kernel moves the data without it
+    passing through Python when both files support it, and falls back to a
+    buffered copy otherwise. Files with a descriptor are read with
+    ``os.pread``, which leaves their position alone, so several threads may
+    copy from one shared file object at once.
+
+    Args:
+        src (file): Source file opened in binary mode
+        dst (file): Destination file opened in binary mode, positioned at
+            the point where the data should be written
+        offset (int): Offset of the first byte to copy in ``src``
+        length (int): Number of bytes to copy
+
+    Returns:
+        int: Number of bytes copied, which is less than ``length`` if
+        ``src`` ends early
+    """
+    copied = 0
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            dst.flush()
+            src_fd = src.fileno()
+            dst_fd = dst.fileno()
+            dst_offset = dst.tell()
+            while copied < length:
+                n = os.copy_file_range(
+                    src_fd, dst_fd, length - copied,
+                    offset + copied, dst_offset + copied
+                )
+                if n == 0:
+                    break
+                copied += n
+            dst.seek(dst_offset + copied)
+            return copied
+        except (OSError, ValueError):
+            # Not a real file, or the filesystem does not support it;
+            # finish with a buffered copy from wherever the kernel stopped
+            if copied:
+                dst.seek(dst_offset + copied)
+
+    src_fd = _file_descriptor(src) if hasattr(os, 'pread') else None
+    if src_fd is None:
+        src.seek(offset + copied)
+    
+    while copied < length:
+        size = min(COPY_BUFFER_SIZE, length - copied)
+        if src_fd is not None:
+            buf = os.pread(src_fd, size, offset + copied)
+        else:
+            buf = src.read(size)
+        if not buf:
+            break
+        dst.write(buf)
+        copied += len(buf)
+
+    return copied
+
+
+class _BufferReader:
+    """
+    Minimal read-only file object over a memoryview
+    
+    Lets :func:`read_wav_info` parse an in-memory WAV file without first
+    copying it into a ``BytesIO``.
+    """
+    
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+    
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos:end].tobytes()
+        self._pos += len(chunk)
+        return chunk
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+    
+    def tell(self):
+        return self._pos
+
+
+def _file_descriptor(f):
+    """Return the descriptor of a file object, or None if it has none"""
+    try:
+        return f.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class SampleBuffer:
+    """
+    Read-only, zero-copy view of the sample data of a WAV file
+
+    The source may be a path, an open binary file, an in-memory file such as
+    ``io.BytesIO``, or a bytes-like object. Files on disk are mapped rather
+    than read, so only the pages that are actually sliced out of :attr:`data`
+    are loaded; in-memory sources are viewed in place. Use as a context
+    manager or call :meth:`close` when done; views derived from :attr:`data`
+    must not outlive the buffer. Buffers made with :meth:`share` keep the
+    mapping and file open until the last of them is closed.
+
+    Attributes:
+        n_channels (int): Number of channels
+        sampwidth (int): Sample width in bytes
+        framerate (int): Sample rate in Hz
+        encoding (str): ``"pcm"`` or ``"float"``
+        fmt_chunk (bytes): Raw ``fmt `` chunk of the file
+        rf64 (bool): Whether the file is an RF64 file
+        n_frames (int): Number of complete frames present in the file
+        n_samples (int): Total number of samples (frames x channels)
+        data_offset (int): Offset of the sample data in the file
+        data_size (int): Size of the sample data in bytes
+        data (memoryview): Raw little-endian sample bytes
+        file (file): The underlying file object, or None for in-memory sources
+    """
+
+    def __init__(self, source):
+        self.file = None
+        self._owns_file = False
+        self._mmap = None
+        self._view = None
+        # Shares count references on the buffer that holds the mapping
+        self._owner = self
+        self._refs = 1
+        self._lock = threading.Lock()
+        self._closed = False
+
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                self._view = memoryview(source).cast('B')
+            elif isinstance(source, io.BytesIO):
+                self._view = source.getbuffer()
+            elif hasattr(source, 'read'):
+                if _file_descriptor(source) is not None:
+                    self.file = source
+                else:
+                    source.seek(0)
+                    self._view = memoryview(source.read())
+            else:
+                self.file = open(source, 'rb')
+                self._owns_file = True
+            
+            reader = self.file if self.file is not None else _BufferReader(self._view)
+            info = read_wav_info(reader)
+            self.n_channels = info["n_channels"]
+            self.sampwidth = info["sampwidth"]
+            self.framerate = info["framerate"]
+            self.encoding = info["encoding"]
+            self.fmt_chunk = info["fmt_chunk"]
+            self.rf64 = info["rf64"]
+            self.data_offset = info["data_offset"]
+            n_frames = info["n_frames"]
+
+            if self.file is not None:
+                available = os.fstat(self.file.fileno()).st_size - self.data_offset
+            else:
+                available = len(self._view) - self.data_offset
+
+            # A truncated data chunk only yields the complete frames present
+            frame_size = self.n_channels * self.sampwidth
+            self.n_frames = min(n_frames, available // frame_size)
+            self.n_samples = self.n_frames * self.n_channels
+            self.data_size = self.n_frames * frame_size
+
+            if self._view is not None:
+                self.data = self._view[self.data_offset:self.data_offset + self.data_size]
+            elif self.data_size:
+                self._mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = memoryview(self._mmap)[self.data_offset:self.data_offset + self.data_size]
+            else:
+                self.data = memoryview(b'')
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def samples(self):
+        """
+        Typed view of the samples as integers, without copying
+
+        The view must be released before the buffer is closed.
+
+        Returns:
+            memoryview: View with one item per sample
+            
+        Raises:
+            ValueError: For 24-bit audio, which has no native sample type
+        """
+        key = (self.encoding, self.sampwidth)
+        if key not in SAMPLE_FORMATS:
+            raise ValueError(f"No typed view for {self.sampwidth * 8}-bit {self.encoding} samples")
+        return self.data.cast(SAMPLE_FORMATS[key])
+
+    def share(self):
+        """
+        Return another buffer over the same mapping
+        
+        Closing the share releases only its own view, so this buffer stays
+        usable. The mapping and the file are released once this buffer and
+        all its shares are closed, whichever closes last.
+        
+        Returns:
+            SampleBuffer: The share
+        """
+        owner = self._owner
+        with owner._lock:
+            owner._refs += 1
+        
+        clone = object.__new__(SampleBuffer)
+        clone.__dict__.update(self.__dict__)
+        clone.data = self.data[:]
+        clone._closed = False
+        return clone
+    
+    def close(self):
+        """Release this view, and the mapping and file once no share uses them"""
+        data = getattr(self, 'data', None)
+        if data is not None:
+            data.release()
+        
+        owner = self._owner
+        with owner._lock:
+            if self._closed:
+                return
+            self._closed = True
+            owner._refs -= 1
+            last = owner._refs == 0
+        if last:
+            owner._release()
+    
+    def _release(self):
+        """Release the mapping and close the file if it was opened here"""
+        if self._view is not None:
+            # Releasing the view lets a BytesIO source be resized again
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_samples(source):
+    """
+    Open a WAV file for zero-copy sample access
+
+    Files opened by path are served from the carrier cache when it is
+    enabled, see :mod:`audio_steg.cache`.
+    
+    Args:
+        source (str, file or bytes): Path to the WAV file, a binary file
+            object, or the file's contents
+
+    Returns:
+        SampleBuffer: View of the file's samples
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file is not a supported WAV file
+    """
+    cache = get_cache()
+    if cache is not None and isinstance(source, (str, os.PathLike)):
+        return cache.open(source, SampleBuffer)
+    
+    return SampleBuffer(source)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the audio steganography library
+
+Synthetic carriers (8/16/32-bit, mono/stereo, seconds to hours long) and
+random images are generated in a scratch directory, then the public API is
+timed on them. Each case runs in a fresh process so its peak RSS is its own.
+Results are written as JSON and can be compared against a saved baseline to
+catch regressions.
+
+Usage:
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import audio_steg
+from audio_steg import (
+    compare_images, extract_image, get_audio_capacity, hide_image, resize_image_for_audio
+)
+from audio_steg import engine
+from audio_steg.header import payload_capacity
+from audio_steg.riff import write_wav_header
+
+
+SAMPLE_RATE = 44100
+SAMPLE_WIDTHS = (1, 2, 4)
+CHANNELS = (1, 2)
+DEFAULT_DURATIONS = (1, 60)
+IMAGE_SIDES = (64, 256, 1024)
+
+# Size of the random blocks carriers are written in
+WRITE_BLOCK = 1 << 22
+
+# Cases faster than this are too noisy to flag as time regressions
+MIN_COMPARABLE_SECONDS = 1e-3
+
+
+def write_carrier(path, seconds, sampwidth, n_channels):
+    """
+    Write a WAV file of random samples
+    
+    Args:
+        path (str): Output path
+        seconds (int): Duration
+        sampwidth (int): Sample width in bytes
+        n_channels (int): Number of channels
+        
+    Returns:
+        int: Size of the sample data in bytes
+    """
+    data_size = seconds * SAMPLE_RATE * n_channels * sampwidth
+    with open(path, 'wb') as f:
+        write_wav_header(f, n_channels, sampwidth, SAMPLE_RATE, data_size)
+        remaining = data_size
+        while remaining:
+            block = min(WRITE_BLOCK, remaining)
+            f.write(os.urandom(block))
+            remaining -= block
+    return data_size
+
+
+def write_random_image(path, side):
+    """Write a square PNG of random RGB pixels"""
+    Image.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(path)
+
+
+def build_cases(workdir, durations, sides):
+    """
+    Generate the inputs and describe every benchmark case
+    
+    Args:
+        workdir (str): Scratch directory for generated files
+        durations (list): Carrier durations in seconds
+        sides (list): Image side lengths in pixels
+        
+    Returns:
+        list: Case dicts with ``name``, ``op``, ``bytes`` and the op's inputs
+    """
+    images = {}
+    for side in sides:
+        images[side] = os.path.join(workdir, f"image_{side}.png")
+        write_random_image(images[side], side)
+    
+    cases = []
+    for seconds in durations:
+        for sampwidth in SAMPLE_WIDTHS:
+            for n_channels in CHANNELS:
+                label = f"{sampwidth * 8}bit/{'stereo' if n_channels == 2 else 'mono'}/{seconds}s"
+                wav_path = os.path.join(workdir, f"carrier_{sampwidth}_{n_channels}_{seconds}.wav")
+                data_size = write_carrier(wav_path, seconds, sampwidth, n_channels)
+                n_samples = data_size // sampwidth
+                
+                cases.append({"name": f"capacity/{label}", "op": "capacity", "wav": wav_path, "bytes": data_size})
+                
+                fitting = [side for side in sides if side * side * 3 <= payload_capacity(n_samples)]
+                for side in fitting:
+                    stego_path = os.path.join(workdir, f"stego_{sampwidth}_{n_channels}_{seconds}_{side}.wav")
+                    hide_image(wav_path, images[side], stego_path, verbose=False)
+                    read_bytes = (12 + side * side * 3) * 8 * sampwidth
+                    cases.append({
+                        "name": f"hide/{label}/{side}px", "op": "hide", "wav": wav_path,
+                        "image": images[side], "bytes": data_size
+                    })
+                    cases.append({
+                        "name": f"extract/{label}/{side}px", "op": "extract", "wav": stego_path,
+                        "bytes": read_bytes
+                    })
+                
+                # Resize the largest image that does not fit, if any
+                too_large = [side for side in sides if side not in fitting]
+                if too_large and sampwidth == 2:
+                    side = too_large[-1]
+                    cases.append({
+                        "name": f"resize/{label}/{side}px", "op": "resize", "wav": wav_path,
+                        "image": images[side], "bytes": side * side * 3
+                    })
+    
+    for side in sides:
+        copy_path = os.path.join(workdir, f"image_{side}_copy.png")
+        shutil.copyfile(images[side], copy_path)
+        cases.append({
+            "name": f"compare/{side}px", "op": "compare", "image": images[side],
+            "copy": copy_path, "bytes": 2 * side * side * 3
+        })
+    
+    return cases
+
+
+def run_op(case, scratch):
+    """Run the operation of a case once"""
+    op = case["op"]
+    if op == "hide":
+        hide_image(case["wav"], case["image"], os.path.join(scratch, "out.wav"), verbose=False)
+    elif op == "extract":
+        extract_image(case["wav"], os.path.join(scratch, "out.png"), verbose=False)
+    elif op == "capacity":
+        get_audio_capacity(case["wav"])
+    elif op == "resize":
+        resize_image_for_audio(case["image"], os.path.join(scratch, "resized.png"),
+                               wav_path=case["wav"], verbose=False)
+    elif op == "compare":
+        compare_images(case["image"], case["copy"], verbose=False)
+    else:
+        raise ValueError(f"Unknown benchmark op: {op}")
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process
+    
+    Returns:
+        float: Peak RSS in MB, or None where ``resource`` is unavailable
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def time_case(case, repeat):
+    """
+    Time one case
+    
+    Args:
+        case (dict): Case description
+        repeat (int): Number of timed runs
+        
+    Returns:
+        dict: The case name with timings, throughput and memory
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        rss_before = peak_rss_mb()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_op(case, scratch)
+            timings.append(time.perf_counter() - start)
+        rss_peak = peak_rss_mb()
+    
+    best = min(timings)
+    return {
+        "name": case["name"],
+        "seconds": best,
+        "median_seconds": statistics.median(timings),
+        "mb_per_s": case["bytes"] / best / 1e6 if best else None,
+        "peak_rss_mb": rss_peak,
+        "rss_growth_mb": None if rss_peak is None else rss_peak - rss_before
+    }
+
+
+def run_cases(cases, repeat, isolate=True):
+    """
+    Time every case, each in a fresh worker process when ``isolate`` is set
+    
+    Yields:
+        dict: One result per case, in order
+    """
+    if not isolate:
+        for case in cases:
+            yield time_case(case, repeat)
+        return
+    
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for case in cases:
+            yield pool.apply(time_case, (case, repeat))
+
+
+def environment():
+    """Describe the machine and library versions the results came from"""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "audio_steg": audio_steg.__version__,
+        "pillow": Image.__version__,
+        "numpy": engine.np.__version__ if engine.np is not None else None
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Find cases that got slower or use more memory than in a baseline
+    
+    Args:
+        results (list): Current results
+        baseline (dict): Saved report
+        tolerance (float): Allowed relative increase, e.g. 0.2 for 20%
+        
+    Returns:
+        list: (name, metric, baseline value, current value) for each regression
+    """
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if metric == "seconds" and old[metric] < MIN_COMPARABLE_SECONDS:
+                continue
+            if old.get(metric) and result.get(metric) and result[metric] > old[metric] * (1 + tolerance):
+                regressions.append((result["name"], metric, old[metric], result[metric]))
+    
+    return regressions
+
+
+def format_result(result):
+    """One line of the progress table"""
+    throughput = f"{result['mb_per_s']:10.1f} MB/s" if result["mb_per_s"] is not None else " " * 15
+    rss = f"{result['peak_rss_mb']:8.1f} MB" if result["peak_rss_mb"] is not None else ""
+    return f"{result['name']:<40} {result['seconds'] * 1000:10.2f} ms {throughput} {rss}"
+
+
+def main():
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the audio steganography library")
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('-b', '--baseline', help='JSON report to compare against')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown or memory growth against the baseline (default: 0.2)')
+    parser.add_argument('-d', '--durations', type=int, nargs='+', default=list(DEFAULT_DURATIONS),
+                        help='Carrier durations in seconds (default: 1 60; add 3600 for hour-long carriers)')
+    parser.add_argument('-s', '--image-sides', type=int, nargs='+', default=list(IMAGE_SIDES),
+                        help='Image side lengths in pixels (default: 64 256 1024)')
+    parser.add_argument('-k', '--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('-n', '--repeat', type=int, default=3, help='Timed runs per case (default: 3)')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='Run all cases in this process (faster, but peak RSS is cumulative)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"[*] Generating carriers and images in {workdir}", file=sys.stderr)
+        cases = build_cases(workdir, args.durations, args.image_sides)
+        if args.filter:
+            cases = [case for case in cases if args.filter in case["name"]]
+        
+        results = []
+        for result in run_cases(cases, args.repeat, isolate=not args.no_isolate):
+            print(format_result(result), file=sys.stderr)
+            results.append(result)
+    
+    report = {"environment": environment(), "results": results}
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[+] Report saved to: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"[!] Regression in {name}: {metric} {old:.4g} -> {new:.4g} ({(new / old - 1) * 100:+.0f}%)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"[+] No regressions beyond {args.tolerance * 100:.0f}% against {args.baseline}", file=sys.stderr)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
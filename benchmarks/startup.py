@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the command-line interface
+
+Each case runs a ``steg`` command in a fresh interpreter, the way shell
+pipelines call it, and reports the wall time from process start to exit.
+The report uses the same format as ``run.py``, so results can be saved and
+compared against a baseline the same way.
+
+Usage:
+    python benchmarks/startup.py --output startup.json
+    python benchmarks/startup.py --baseline startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from run import compare_to_baseline, environment, format_result, write_carrier
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "cli", "steg.py")
+
+# Heavy modules whose presence after a command is reported
+HEAVY_MODULES = ("PIL", "numpy")
+
+# Runs one command and prints which heavy modules it loaded
+PROBE = """
+import runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+sys.stderr.write(repr(sorted(name for name in {modules!r} if name in sys.modules)))
+"""
+
+
+def build_cases(workdir):
+    """
+    Describe the commands to time
+    
+    Args:
+        workdir (str): Scratch directory for generated files
+        
+    Returns:
+        list: Case dicts with ``name`` and ``argv``
+    """
+    wav_path = os.path.join(workdir, "carrier.wav")
+    write_carrier(wav_path, 1, 2, 2)
+    
+    return [
+        {"name": "startup/python", "argv": [sys.executable, "-c", "pass"]},
+        {"name": "startup/import audio_steg", "argv": [sys.executable, "-c", "import audio_steg"]},
+        {"name": "startup/steg --help", "argv": [sys.executable, CLI, "--help"]},
+        {"name": "startup/steg capacity", "argv": [sys.executable, CLI, "capacity", wav_path]},
+        {"name": "startup/steg scan", "argv": [sys.executable, CLI, "scan", workdir]},
+    ]
+
+
+def time_case(case, repeat):
+    """
+    Time one command
+    
+    Args:
+        case (dict): Case description
+        repeat (int): Number of timed runs
+        
+    Returns:
+        dict: The case name with timings and the heavy modules it loaded
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(case["argv"], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    
+    modules = None
+    if case["argv"][1] == CLI:
+        probe = PROBE.format(modules=HEAVY_MODULES)
+        completed = subprocess.run(
+            [sys.executable, "-c", probe] + case["argv"][1:], cwd=ROOT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True
+        )
+        modules = completed.stderr.strip().splitlines()[-1]
+    
+    best = min(timings)
+    return {
+        "name": case["name"],
+        "seconds": best,
+        "median_seconds": statistics.median(timings),
+        "mb_per_s": None,
+        "peak_rss_mb": None,
+        "heavy_modules": modules
+    }
+
+
+def main():
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark steg command startup time")
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('-b', '--baseline', help='JSON report to compare against')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown against the baseline (default: 0.2)')
+    parser.add_argument('-n', '--repeat', type=int, default=20, help='Timed runs per command (default: 20)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        results = []
+        for case in build_cases(workdir):
+            result = time_case(case, args.repeat)
+            modules = f"  loads {result['heavy_modules']}" if result["heavy_modules"] is not None else ""
+            print(format_result(result) + modules, file=sys.stderr)
+            results.append(result)
+    
+    report = {"environment": environment(), "results": results}
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[+] Report saved to: {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"[!] Regression in {name}: {metric} {old:.4g} -> {new:.4g} ({(new / old - 1) * 100:+.0f}%)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"[+] No regressions beyond {args.tolerance * 100:.0f}% against {args.baseline}", file=sys.stderr)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,24 +4,91 @@ Command-line interface for audio steganography library
 """
 
 import argparse
+import json
 import sys
 import os
+import threading
+import time
+import tracemalloc
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from audio_steg import hide_image, extract_image, resize_image_for_audio, get_audio_capacity, compare_images
+# Library functions are imported by the command handlers that use them, so
+# light commands such as capacity and scan start without loading Pillow
+
+
+def _print_metrics(report):
+    """Print a per-phase metrics report as a table on stderr"""
+    print(f"\nProfile ({report['operation']}, {report['total_seconds'] * 1000:.1f} ms total):", file=sys.stderr)
+    print(f"  {'Phase':<12} {'Time':>12} {'Bytes':>14} {'Throughput':>14} {'Peak alloc':>12}", file=sys.stderr)
+    for name, entry in report["phases"].items():
+        seconds = entry["seconds"]
+        throughput = f"{entry['bytes'] / seconds / 1e6:.1f} MB/s" if seconds and entry["bytes"] else "-"
+        peak = f"{entry['peak_alloc_bytes'] / 1e6:.1f} MB" if entry["peak_alloc_bytes"] is not None else "-"
+        print(f"  {name:<12} {seconds * 1000:>9.2f} ms {entry['bytes']:>14,} {throughput:>14} {peak:>12}", file=sys.stderr)
+
+
+class _ProgressBar:
+    """Progress bar on stderr, redrawn at most every ``interval`` seconds"""
+    
+    WIDTH = 30
+    
+    def __init__(self, label, interval=0.1):
+        self.label = label
+        self.interval = interval
+        self._last = 0.0
+    
+    def __call__(self, done, total):
+        now = time.monotonic()
+        finished = done >= total
+        if not finished and now - self._last < self.interval:
+            return
+        self._last = now
+        
+        fraction = done / total if total else 1.0
+        filled = int(fraction * self.WIDTH)
+        bar = '#' * filled + '-' * (self.WIDTH - filled)
+        end = '\n' if finished else ''
+        print(f"\r{self.label} [{bar}] {fraction * 100:5.1f}%", end=end, file=sys.stderr, flush=True)
+
+
+def _progress_options(args, label):
+    """
+    Build the ``progress`` and ``cancel`` arguments for a command
+    
+    The bar is shown unless --quiet is given or stderr is not a terminal;
+    --timeout sets the cancel token once the time runs out.
+    """
+    progress = None
+    if not args.quiet and sys.stderr.isatty():
+        progress = _ProgressBar(label)
+    
+    cancel = None
+    if args.timeout:
+        cancel = threading.Event()
+        timer = threading.Timer(args.timeout, cancel.set)
+        timer.daemon = True
+        timer.start()
+    
+    return {"progress": progress, "cancel": cancel}
 
 
 def cmd_hide(args):
     """Hide command handler"""
+    from audio_steg import hide_image
+    
     try:
         result = hide_image(
             args.audio, 
             args.image, 
             args.output, 
             verbose=not args.quiet, 
-            auto_resize=args.auto_resize
+            auto_resize=args.auto_resize,
+            bits_per_sample=args.bits_per_sample,
+            compression=args.compression,
+            metrics_callback=_start_profiling(args),
+            **_progress_options(args, "Embedding")
         )
         if not args.quiet:
             print(f"\n✅ Success! Capacity used: {result['capacity_usage']:.2f}%")
@@ -31,10 +98,37 @@ def cmd_hide(args):
         return 1
 
 
+def _start_profiling(args):
+    """Trace allocations when --profile is given, so phases report peak memory"""
+    if args.profile:
+        tracemalloc.start()
+    return _print_metrics if args.profile else None
+
+
+def _parse_crop(value):
+    """Parse an ``x,y,w,h`` crop argument into a (left, upper, right, lower) box"""
+    try:
+        x, y, w, h = (int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected x,y,w,h, got '{value}'")
+    return (x, y, x + w, y + h)
+
+
 def cmd_extract(args):
     """Extract command handler"""
+    from audio_steg import extract_image, extract_region
+    
     try:
-        result = extract_image(args.audio, args.output, verbose=not args.quiet)
+        if args.crop:
+            img = extract_region(args.audio, args.crop, verbose=not args.quiet)
+            img.save(args.output)
+            if not args.quiet:
+                print(f"\n✅ Success! Extracted {img.width}x{img.height} region to {args.output}")
+            return 0
+        
+        result = extract_image(args.audio, args.output, verbose=not args.quiet,
+                               metrics_callback=_start_profiling(args), name=args.name,
+                               **_progress_options(args, "Extracting"))
         if not args.quiet:
             print(f"\n✅ Success! Extracted {result['image_size'][0]}x{result['image_size'][1]} image")
         return 0
@@ -43,15 +137,77 @@ def cmd_extract(args):
         return 1
 
 
+def cmd_hide_many(args):
+    """Hide many command handler"""
+    from audio_steg import hide_images
+    
+    try:
+        result = hide_images(
+            args.audio,
+            args.images,
+            args.output,
+            verbose=not args.quiet,
+            bits_per_sample=args.bits_per_sample,
+            compression=args.compression,
+            metrics_callback=_start_profiling(args),
+            **_progress_options(args, "Embedding")
+        )
+        if not args.quiet:
+            print(f"\n✅ Success! Hid {len(result['payloads'])} images, capacity used: {result['capacity_usage']:.2f}%")
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_list(args):
+    """List command handler"""
+    from audio_steg import list_payloads
+    
+    try:
+        payloads = list_payloads(args.audio)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+    
+    for payload in payloads:
+        if args.json:
+            print(json.dumps(payload))
+        else:
+            width, height = payload['image_size']
+            name = payload['name'] if payload['name'] is not None else '-'
+            print(f"{name}\t{width}x{height}\t{payload['data_bytes']} bytes\t{payload['compression']}")
+    return 0
+
+
+def cmd_preview(args):
+    """Preview command handler"""
+    from audio_steg import extract_preview
+    
+    try:
+        img = extract_preview(args.audio, max_side=args.max_side, verbose=not args.quiet)
+        img.save(args.output)
+        if not args.quiet:
+            print(f"\n✅ Success! Saved {img.width}x{img.height} preview to {args.output}")
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+
+
 def cmd_resize(args):
     """Resize command handler"""
+    from audio_steg import resize_image_for_audio
+    
     try:
         result = resize_image_for_audio(
             args.image, 
             args.output, 
             wav_path=args.audio,
             max_bytes=args.max_bytes,
-            verbose=not args.quiet
+            verbose=not args.quiet,
+            bits_per_sample=args.bits_per_sample,
+            keep_aspect=not args.relax_aspect
         )
         if not args.quiet:
             if result['resized']:
@@ -66,17 +222,19 @@ def cmd_resize(args):
 
 def cmd_capacity(args):
     """Capacity command handler"""
+    from audio_steg import get_audio_capacity
+    
     try:
-        result = get_audio_capacity(args.audio)
+        result = get_audio_capacity(args.audio, bits_per_sample=args.bits_per_sample)
         print(f"\n{'='*70}")
         print(f"Audio Capacity Information: {args.audio}")
         print(f"{'='*70}")
         print(f"Duration:      {result['duration_seconds']:.2f} seconds")
         print(f"Sample Rate:   {result['sample_rate']:,} Hz")
         print(f"Channels:      {result['channels']}")
-        print(f"Sample Width:  {result['sample_width']} bytes")
+        print(f"Sample Width:  {result['sample_width']} bytes ({result['encoding']})")
         print(f"Total Samples: {result['samples']:,}")
-        print(f"\nSteganography Capacity:")
+        print(f"\nSteganography Capacity ({result['bits_per_sample']} bit(s) per sample):")
         print(f"  {result['capacity_bytes']:,} bytes")
         print(f"  {result['capacity_kb']:.2f} KB")
         print(f"  {result['capacity_kb']/1024:.2f} MB")
@@ -89,8 +247,14 @@ def cmd_capacity(args):
 
 def cmd_compare(args):
     """Compare command handler"""
+    from audio_steg import compare_images
+    from audio_steg.compare import render_heatmap
+    
     try:
         result = compare_images(args.image1, args.image2, verbose=True)
+        if args.heatmap and "heatmap" in result:
+            render_heatmap(result["heatmap"]).save(args.heatmap)
+            print(f"[+] Difference heatmap saved to: {args.heatmap}")
         print()
         if result['identical']:
             print("✅ Images are identical!")
@@ -102,6 +266,144 @@ def cmd_compare(args):
         return 1
 
 
+def cmd_scan(args):
+    """Scan command handler"""
+    from audio_steg import scan_directory
+    
+    try:
+        results = scan_directory(args.directory, pattern=args.pattern, recursive=args.recursive, workers=args.jobs)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+    
+    found = 0
+    for result in results:
+        if result['has_payload']:
+            found += 1
+        
+        if args.json:
+            print(json.dumps(result))
+        elif result['has_payload']:
+            width, height = result['image_size']
+            print(f"✅ {result['path']}: {width}x{height} image, {result['data_bytes']:,} bytes, "
+                  f"{result['bits_per_sample']} bit(s)/sample, {result['compression']}")
+        elif args.all:
+            print(f"   {result['path']}: no payload")
+    
+    if not args.json:
+        print(f"\n{found} of {len(results)} files carry a payload")
+    return 0
+
+
+def cmd_serve(args):
+    """Serve command handler"""
+    from audio_steg.server import serve
+    
+    def ready(server):
+        address = args.socket or f"http://{server.server_address[0]}:{server.server_address[1]}"
+        print(f"[*] Serving on {address}", file=sys.stderr)
+    
+    try:
+        address = {key: value for key, value in (("host", args.host), ("port", args.port)) if value is not None}
+        serve(socket_path=args.socket, workers=args.workers, quiet=args.quiet, ready=ready, **address)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_batch_command(kind, args, **options):
+    """Shared handler for batch-hide and batch-extract"""
+    from audio_steg.batch import jobs_from_globs, load_manifest, run_batch
+    
+    try:
+        if args.manifest:
+            jobs = load_manifest(args.manifest, kind)
+        elif args.audio_glob and args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            jobs = jobs_from_globs(
+                kind, args.audio_glob, args.output_dir,
+                image_glob=getattr(args, 'image_glob', None),
+                extension=getattr(args, 'extension', '.png')
+            )
+        else:
+            raise ValueError("Provide a manifest, or --audio-glob and --output-dir")
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+    
+    # One JSON object per job on stdout
+    failures = 0
+    for result in run_batch(kind, jobs, workers=args.jobs, **options):
+        if not result['success']:
+            failures += 1
+        print(json.dumps(result), flush=True)
+    
+    if failures:
+        print(f"❌ {failures} of {len(jobs)} jobs failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_batch_hide(args):
+    """Batch hide command handler"""
+    return _run_batch_command(
+        'hide', args,
+        auto_resize=args.auto_resize,
+        bits_per_sample=args.bits_per_sample,
+        compression=args.compression
+    )
+
+
+def cmd_batch_extract(args):
+    """Batch extract command handler"""
+    return _run_batch_command('extract', args)
+
+
+def cmd_hide_sharded(args):
+    """Sharded hide command handler"""
+    from audio_steg import hide_image_sharded
+    
+    try:
+        os.makedirs(args.output_dir, exist_ok=True)
+        outputs = [
+            os.path.join(args.output_dir, f"{os.path.splitext(os.path.basename(path))[0]}.shard{index + 1}.wav")
+            for index, path in enumerate(args.audio)
+        ]
+        result = hide_image_sharded(
+            args.audio,
+            args.image,
+            outputs,
+            verbose=not args.quiet,
+            bits_per_sample=args.bits_per_sample,
+            compression=args.compression,
+            workers=args.jobs
+        )
+        if not args.quiet:
+            print(f"\n✅ Success! Split {result['data_bytes']} bytes across {len(result['shards'])} carriers")
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_extract_sharded(args):
+    """Sharded extract command handler"""
+    from audio_steg import extract_image_sharded
+    
+    try:
+        sources = args.shards[0] if len(args.shards) == 1 and os.path.isdir(args.shards[0]) else args.shards
+        result = extract_image_sharded(sources, args.output, verbose=not args.quiet,
+                                       payload_id=args.payload_id, workers=args.jobs)
+        if not args.quiet:
+            print(f"\n✅ Success! Extracted {result['image_size'][0]}x{result['image_size'][1]} image "
+                  f"from {len(result['shards'])} shards")
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -114,15 +416,46 @@ Examples:
   
   # Extract an image
   %(prog)s extract stego.wav recovered.jpg
+  %(prog)s extract stego.wav tile.png --crop 512,256,256,256
   
   # Check audio capacity
   %(prog)s capacity audio.wav
   
+  # Use 2 bits per sample for twice the capacity
+  %(prog)s hide -k 2 audio.wav secret.jpg output.wav
+  
+  # Embed the JPEG file itself instead of raw pixels
+  %(prog)s hide -c original audio.wav secret.jpg output.wav
+  
+  # Bundle several images in one file, list them, and extract one by name
+  %(prog)s hide-many audio.wav bundle.wav icon.png logo.png banner.png
+  %(prog)s list bundle.wav
+  %(prog)s extract bundle.wav logo.png --name logo.png
+  
+  # Save a thumbnail of the hidden image
+  %(prog)s preview stego.wav thumb.png -s 128
+  
   # Resize image to fit
   %(prog)s resize -a audio.wav large.jpg resized.jpg
   
   # Compare images
   %(prog)s compare original.jpg extracted.jpg
+  
+  # Hide many images from a CSV manifest (audio,image,output) on 8 processes
+  %(prog)s batch-hide jobs.csv -j 8
+  
+  # Extract every stego file in a directory
+  %(prog)s batch-extract --audio-glob 'stego/*.wav' --output-dir recovered/
+  
+  # Split a large image across three carriers, and put it back together
+  %(prog)s hide-sharded huge.png -a a.wav b.wav c.wav -o shards/
+  %(prog)s extract-sharded recovered.png shards/
+  
+  # Find the files in an archive that carry a payload
+  %(prog)s scan -r archive/
+  
+  # Serve requests from a warm daemon instead of starting steg each time
+  %(prog)s serve --socket /run/steg.sock -w 4
         """
     )
     
@@ -137,7 +470,11 @@ Examples:
     hide_parser.add_argument('image', help='Image to hide')
     hide_parser.add_argument('output', help='Output WAV file')
     hide_parser.add_argument('-r', '--auto-resize', action='store_true', help='Automatically resize image if too large')
+    hide_parser.add_argument('-k', '--bits-per-sample', type=int, default=1, help='LSBs per sample used for image data (1-4, default: 1)')
+    hide_parser.add_argument('-c', '--compression', choices=['zlib', 'lzma', 'zstd', 'original'], help='Compress image data, or embed the original image file bytes')
     hide_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
+    hide_parser.add_argument('--profile', action='store_true', help='Print time, bytes and peak allocation per phase')
+    hide_parser.add_argument('--timeout', type=float, metavar='SECONDS', help='Cancel if not finished within this time')
     hide_parser.set_defaults(func=cmd_hide)
     
     # Extract command
@@ -145,30 +482,136 @@ Examples:
     extract_parser.add_argument('audio', help='WAV file with hidden image')
     extract_parser.add_argument('output', help='Output image file')
     extract_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
+    extract_parser.add_argument('--profile', action='store_true', help='Print time, bytes and peak allocation per phase')
+    extract_parser.add_argument('--timeout', type=float, metavar='SECONDS', help='Cancel if not finished within this time')
+    extract_parser.add_argument('--crop', type=_parse_crop, metavar='X,Y,W,H',
+                                help='Extract only this region, reading just the samples that hold it '
+                                     '(not with --name, --profile or --timeout)')
+    extract_parser.add_argument('-n', '--name', help='Payload to extract from a file written by hide-many')
     extract_parser.set_defaults(func=cmd_extract)
     
+    # Hide many command
+    hide_many_parser = subparsers.add_parser('hide-many', help='Hide several named images in one WAV file')
+    hide_many_parser.add_argument('audio', help='Input WAV file')
+    hide_many_parser.add_argument('output', help='Output WAV file')
+    hide_many_parser.add_argument('images', nargs='+', help='Images to hide, each named by its file name')
+    hide_many_parser.add_argument('-k', '--bits-per-sample', type=int, default=1, help='LSBs per sample used for image data (1-4, default: 1)')
+    hide_many_parser.add_argument('-c', '--compression', choices=['zlib', 'lzma', 'zstd', 'original'], help='Compress image data, or embed the original image file bytes')
+    hide_many_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
+    hide_many_parser.add_argument('--profile', action='store_true', help='Print time, bytes and peak allocation per phase')
+    hide_many_parser.add_argument('--timeout', type=float, metavar='SECONDS', help='Cancel if not finished within this time')
+    hide_many_parser.set_defaults(func=cmd_hide_many)
+    
+    # List command
+    list_parser = subparsers.add_parser('list', help='List the images hidden in a WAV file')
+    list_parser.add_argument('audio', help='WAV file with hidden images')
+    list_parser.add_argument('--json', action='store_true', help='Print one JSON object per image')
+    list_parser.set_defaults(func=cmd_list)
+    
+    # Preview command
+    preview_parser = subparsers.add_parser('preview', help='Extract a low-resolution preview of a hidden image')
+    preview_parser.add_argument('audio', help='WAV file with hidden image')
+    preview_parser.add_argument('output', help='Output image file')
+    preview_parser.add_argument('-s', '--max-side', type=int, default=128, help='Largest preview width or height (default: 128)')
+    preview_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
+    preview_parser.set_defaults(func=cmd_preview)
+    
     # Resize command
     resize_parser = subparsers.add_parser('resize', help='Resize image to fit audio capacity')
     resize_parser.add_argument('image', help='Input image')
     resize_parser.add_argument('output', help='Output resized image')
     resize_parser.add_argument('-a', '--audio', help='WAV file to check capacity')
     resize_parser.add_argument('-b', '--max-bytes', type=int, help='Maximum bytes (alternative to --audio)')
+    resize_parser.add_argument('-k', '--bits-per-sample', type=int, default=1, help='LSBs per sample the image will be hidden with (default: 1)')
+    resize_parser.add_argument('--relax-aspect', action='store_true', help='Let the aspect ratio drift slightly to fill the capacity')
     resize_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
     resize_parser.set_defaults(func=cmd_resize)
     
     # Capacity command
     capacity_parser = subparsers.add_parser('capacity', help='Check audio file capacity')
     capacity_parser.add_argument('audio', help='WAV file to analyze')
+    capacity_parser.add_argument('-k', '--bits-per-sample', type=int, default=1, help='LSBs per sample used for image data (1-4, default: 1)')
     capacity_parser.set_defaults(func=cmd_capacity)
     
     # Compare command
     compare_parser = subparsers.add_parser('compare', help='Compare two images')
     compare_parser.add_argument('image1', help='First image')
     compare_parser.add_argument('image2', help='Second image')
+    compare_parser.add_argument('--heatmap', metavar='PATH', help='Save an image showing where the images differ')
     compare_parser.set_defaults(func=cmd_compare)
     
+    # Scan command
+    scan_parser = subparsers.add_parser('scan', help='Find WAV files that carry a hidden image')
+    scan_parser.add_argument('directory', help='Directory to scan')
+    scan_parser.add_argument('-r', '--recursive', action='store_true', help='Scan subdirectories too')
+    scan_parser.add_argument('-p', '--pattern', default='*.wav', help='File name pattern (default: *.wav)')
+    scan_parser.add_argument('-j', '--jobs', type=int, help='Number of threads')
+    scan_parser.add_argument('-a', '--all', action='store_true', help='Also list files without a payload')
+    scan_parser.add_argument('--json', action='store_true', help='Print one JSON object per file')
+    scan_parser.set_defaults(func=cmd_scan)
+    
+    # Batch hide command
+    batch_hide_parser = subparsers.add_parser('batch-hide', help='Hide many images in parallel')
+    batch_hide_parser.add_argument('manifest', nargs='?', help='CSV or JSONL manifest with audio, image and output fields')
+    batch_hide_parser.add_argument('--audio-glob', help='Carrier WAV files (paired with images by file name, or one carrier for all)')
+    batch_hide_parser.add_argument('--image-glob', help='Images to hide')
+    batch_hide_parser.add_argument('--output-dir', help='Directory for output WAV files')
+    batch_hide_parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: CPU count)')
+    batch_hide_parser.add_argument('-r', '--auto-resize', action='store_true', help='Automatically resize images if too large')
+    batch_hide_parser.add_argument('-k', '--bits-per-sample', type=int, default=1, help='LSBs per sample used for image data (1-4, default: 1)')
+    batch_hide_parser.add_argument('-c', '--compression', choices=['zlib', 'lzma', 'zstd', 'original'], help='Compress image data, or embed the original image file bytes')
+    batch_hide_parser.set_defaults(func=cmd_batch_hide)
+    
+    # Batch extract command
+    batch_extract_parser = subparsers.add_parser('batch-extract', help='Extract many images in parallel')
+    batch_extract_parser.add_argument('manifest', nargs='?', help='CSV or JSONL manifest with audio and output fields')
+    batch_extract_parser.add_argument('--audio-glob', help='WAV files with hidden images')
+    batch_extract_parser.add_argument('--output-dir', help='Directory for extracted images')
+    batch_extract_parser.add_argument('--extension', default='.png', help='Extracted image file extension (default: .png)')
+    batch_extract_parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: CPU count)')
+    batch_extract_parser.set_defaults(func=cmd_batch_extract)
+    
+    # Hide sharded command
+    hide_sharded_parser = subparsers.add_parser('hide-sharded', help='Hide one image across several WAV files')
+    hide_sharded_parser.add_argument('image', help='Image to hide')
+    hide_sharded_parser.add_argument('-a', '--audio', nargs='+', required=True, help='Carrier WAV files')
+    hide_sharded_parser.add_argument('-o', '--output-dir', required=True, help='Directory for the output WAV files')
+    hide_sharded_parser.add_argument('-k', '--bits-per-sample', type=int, default=1, help='LSBs per sample used for image data (1-4, default: 1)')
+    hide_sharded_parser.add_argument('-c', '--compression', choices=['zlib', 'lzma', 'zstd', 'original'], help='Compress image data, or embed the original image file bytes')
+    hide_sharded_parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: CPU count)')
+    hide_sharded_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
+    hide_sharded_parser.set_defaults(func=cmd_hide_sharded)
+    
+    # Extract sharded command
+    extract_sharded_parser = subparsers.add_parser('extract-sharded', help='Reassemble an image hidden across several WAV files')
+    extract_sharded_parser.add_argument('output', help='Output image file')
+    extract_sharded_parser.add_argument('shards', nargs='+', help='Shard WAV files in any order, or a directory holding them')
+    extract_sharded_parser.add_argument('--payload-id', help='Payload to extract when the files hold several')
+    extract_sharded_parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: CPU count)')
+    extract_sharded_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress output')
+    extract_sharded_parser.set_defaults(func=cmd_extract_sharded)
+    
+    # Serve command
+    serve_parser = subparsers.add_parser('serve', help='Run a local HTTP daemon with a warm worker pool')
+    serve_parser.add_argument('--host', help='Address to listen on (default: 127.0.0.1)')
+    serve_parser.add_argument('-p', '--port', type=int, help='TCP port (default: 8765)')
+    serve_parser.add_argument('-s', '--socket', help='Listen on this Unix socket instead of a TCP port')
+    serve_parser.add_argument('-w', '--workers', type=int, help='Number of worker processes (default: CPU count; 0 runs jobs in the request threads)')
+    serve_parser.add_argument('-q', '--quiet', action='store_true', help='Do not log requests')
+    serve_parser.set_defaults(func=cmd_serve)
+    
     args = parser.parse_args()
     
+    # Regions are read directly from the samples, without the options of a
+    # full extraction
+    if args.func is cmd_extract and args.crop:
+        unsupported = [
+            flag for flag, value in (("--name", args.name), ("--profile", args.profile), ("--timeout", args.timeout))
+            if value not in (None, False)
+        ]
+        if unsupported:
+            extract_parser.error(f"--crop cannot be combined with {', '.join(unsupported)}")
+    
     try:
         return args.func(args)
     except KeyboardInterrupt:
@@ -36,6 +36,9 @@ setup(
         "Pillow>=9.0.0",
     ],
     extras_require={
+        "fast": [
+            "numpy>=1.17.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=22.0.0",
@@ -0,0 +1,82 @@
+"""
+Tests for the asyncio API
+"""
+
+import asyncio
+import io
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import aio, get_audio_capacity
+from tests.test_engine import write_image, write_wav
+
+
+class TestAio(unittest.TestCase):
+    """Test cases for the asyncio API"""
+    
+    def setUp(self):
+        """Create a carrier and an image, and a small process pool"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.wav_path = self.path("carrier.wav")
+        self.image_path = self.path("secret.png")
+        write_wav(self.wav_path, 2000)
+        write_image(self.image_path, (9, 7))
+        
+        aio.configure(max_workers=2, max_concurrency=3)
+        self.addCleanup(aio.configure)
+    
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+    
+    def test_concurrent_round_trips(self):
+        """Many concurrent jobs complete with the same results as blocking calls"""
+        async def round_trip(i):
+            stego_path = self.path(f"stego_{i}.wav")
+            out_path = self.path(f"out_{i}.png")
+            await aio.hide_image(self.wav_path, self.image_path, stego_path, bits_per_sample=1 + i % 2)
+            return await aio.extract_image(stego_path, out_path)
+        
+        async def main():
+            return await asyncio.gather(*(round_trip(i) for i in range(6)))
+        
+        results = asyncio.run(main())
+        with Image.open(self.image_path) as expected:
+            for i, result in enumerate(results):
+                self.assertEqual(result["image_size"], (9, 7))
+                with Image.open(self.path(f"out_{i}.png")) as out:
+                    self.assertEqual(out.tobytes(), expected.tobytes())
+    
+    def test_in_memory_and_capacity(self):
+        """Bytes, file objects and capacity queries work from a coroutine"""
+        with open(self.wav_path, 'rb') as f:
+            wav_bytes = f.read()
+        with open(self.image_path, 'rb') as f:
+            image_bytes = f.read()
+        progress = []
+        
+        async def main():
+            stego = await aio.hide_image_bytes(wav_bytes, image_bytes)
+            png = await aio.extract_image_bytes(io.BytesIO(stego),
+                                                progress=lambda done, total: progress.append(done))
+            capacity = await aio.get_audio_capacity(self.wav_path)
+            wide = await aio.get_audio_capacity(self.wav_path, bits_per_sample=2)
+            return png, capacity, wide
+        
+        png, capacity, wide = asyncio.run(main())
+        with Image.open(io.BytesIO(png)) as out, Image.open(self.image_path) as expected:
+            self.assertEqual(out.tobytes(), expected.tobytes())
+        self.assertEqual(progress[-1], 9 * 7 * 3)
+        self.assertEqual(capacity, get_audio_capacity(self.wav_path))
+        self.assertEqual(wide, get_audio_capacity(self.wav_path, bits_per_sample=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for batch hide/extract jobs
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_steg.batch import batch_extract, batch_hide, jobs_from_globs, load_manifest
+from tests.test_engine import write_image, write_wav
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for batch jobs"""
+    
+    def setUp(self):
+        """Create carriers, images and a manifest"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+        
+        lines = ["audio,image,output,bits_per_sample"]
+        for i in range(3):
+            write_wav(os.path.join(self.dir, f"c{i}.wav"), 2000, seed=i)
+            write_image(os.path.join(self.dir, f"c{i}.png"), (6, 5), seed=i)
+            lines.append(f"c{i}.wav,c{i}.png,o{i}.wav,{i % 2 + 1}")
+        lines.append("c0.wav,missing.png,bad.wav,")
+        
+        self.manifest = os.path.join(self.dir, "jobs.csv")
+        with open(self.manifest, "w") as f:
+            f.write("\n".join(lines) + "\n")
+    
+    def test_manifest_round_trip(self):
+        """Manifest jobs run in a pool and failures are reported per job"""
+        jobs = load_manifest(self.manifest, "hide")
+        self.assertEqual(jobs[1]["bits_per_sample"], 2)
+        
+        results = list(batch_hide(jobs, workers=2))
+        self.assertEqual([r["index"] for r in results], [0, 1, 2, 3])
+        self.assertEqual([r["success"] for r in results], [True, True, True, False])
+        self.assertIn("FileNotFoundError", results[3]["error"])
+        
+        out_dir = os.path.join(self.dir, "out")
+        os.mkdir(out_dir)
+        jobs = jobs_from_globs("extract", os.path.join(self.dir, "o*.wav"), out_dir)
+        results = list(batch_extract(jobs, workers=1))
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r["success"] and r["image_size"] == (6, 5) for r in results))
+    
+    def test_missing_field(self):
+        """Manifest rows without a required field are rejected"""
+        manifest = os.path.join(self.dir, "jobs.jsonl")
+        with open(manifest, "w") as f:
+            f.write('{"audio": "c0.wav", "image": "c0.png"}\n')
+        
+        with self.assertRaises(ValueError):
+            load_manifest(manifest, "hide")
+
+
+if __name__ == "__main__":
+    unittest.main()
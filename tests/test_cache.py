@@ -0,0 +1,96 @@
+"""
+Tests for the opt-in carrier cache
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import disable_cache, enable_cache, get_audio_capacity, hide_image, hide_image_bytes, wavio
+from audio_steg.wavio import open_samples
+from tests.test_engine import write_image, write_wav
+
+
+class TestCache(unittest.TestCase):
+    """Test cases for the carrier cache"""
+    
+    def setUp(self):
+        """Create a carrier and enable the cache"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.wav_path = os.path.join(self.tmp.name, "carrier.wav")
+        write_wav(self.wav_path, 2000)
+        self.cache = enable_cache(max_bytes=10000)
+        self.addCleanup(disable_cache)
+    
+    def test_reuse_and_invalidation(self):
+        """Repeated opens share one mapping until the file changes"""
+        with open_samples(self.wav_path) as a, open_samples(self.wav_path) as b:
+            self.assertEqual(a.data, b.data)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        
+        image_path = os.path.join(self.tmp.name, "secret.png")
+        write_image(image_path, (5, 5))
+        get_audio_capacity(self.wav_path)
+        hide_image(self.wav_path, image_path, os.path.join(self.tmp.name, "out.wav"), verbose=False)
+        self.assertEqual(self.cache.hits, 3)
+        
+        write_wav(self.wav_path, 1000, seed=1)
+        with open_samples(self.wav_path) as c:
+            self.assertEqual(c.n_frames, 1000)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+    
+    def test_concurrent_shares(self):
+        """Threads sharing one cached carrier each copy its tail intact"""
+        original = wavio.COPY_BUFFER_SIZE
+        wavio.COPY_BUFFER_SIZE = 64
+        self.addCleanup(setattr, wavio, "COPY_BUFFER_SIZE", original)
+        
+        img = Image.new('RGB', (2, 2), 'red')
+        with open(self.wav_path, 'rb') as f:
+            expected = hide_image_bytes(f.read(), img)
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(lambda _: hide_image_bytes(self.wav_path, img), range(32)))
+        self.assertEqual(outputs, [expected] * 32)
+    
+    def test_eviction_by_size(self):
+        """Least recently used carriers are dropped to stay within budget"""
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f"c{i}.wav")
+            write_wav(path, 2000, seed=i)  # 4000 bytes of samples each
+            paths.append(path)
+            open_samples(path).close()
+        
+        stats = self.cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"]), (2, 8000))
+        
+        open_samples(paths[0]).close()
+        self.assertEqual(self.cache.misses, 4)
+
+
+    def test_evict_with_open_share(self):
+        """An evicted carrier stays usable by open shares and is closed by the last one"""
+        share = open_samples(self.wav_path)
+        with open(self.wav_path, 'rb') as f:
+            expected = f.read()[share.data_offset:]
+        
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertFalse(share.file.closed)
+        self.assertEqual(bytes(share.data), expected)
+        
+        share.close()
+        self.assertTrue(share.file.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
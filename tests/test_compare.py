@@ -0,0 +1,126 @@
+"""
+Tests for the bulk image comparison
+"""
+
+import math
+import random
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import compare, compare_images
+
+
+def reference_stats(img1, img2):
+    """Per-pixel statistics computed the slow, obvious way"""
+    data1, data2 = img1.tobytes(), img2.tobytes()
+    pixels = [(data1[i:i + 3], data2[i:i + 3]) for i in range(0, len(data1), 3)]
+    errors = [[abs(a - b) for a, b in zip(p1, p2)] for p1, p2 in pixels]
+    squared = sum(e * e for error in errors for e in error)
+    return {
+        "different_pixels": sum(1 for p1, p2 in pixels if p1 != p2),
+        "max_abs_error": [max(error[c] for error in errors) for c in range(3)],
+        "mean_abs_error": [sum(error[c] for error in errors) / len(errors) for c in range(3)],
+        "psnr": 10 * math.log10(255 ** 2 * 3 * len(errors) / squared) if squared else math.inf,
+    }
+
+
+def rounded(value):
+    """Round floats, or lists of them, for comparison"""
+    if isinstance(value, list):
+        return [round(v, 9) for v in value]
+    return round(value, 9)
+
+
+class TestCompare(unittest.TestCase):
+    """Test cases for compare_pixels and compare_images"""
+    
+    def setUp(self):
+        """Build a pair of images differing in scattered pixels"""
+        rng = random.Random(3)
+        self.size = (70, 45)
+        data = bytes(rng.getrandbits(8) for _ in range(70 * 45 * 3))
+        self.img1 = Image.frombytes('RGB', self.size, data)
+        
+        changed = bytearray(data)
+        for _ in range(200):
+            changed[rng.randrange(len(changed))] = rng.getrandbits(8)
+        self.img2 = Image.frombytes('RGB', self.size, bytes(changed))
+    
+    def run_both_backends(self, func):
+        """Run ``func`` with NumPy (if available) and with the Pillow fallback"""
+        backends = [compare.np, None] if compare.np is not None else [None]
+        for backend in backends:
+            original = compare.np
+            compare.np = backend
+            try:
+                with self.subTest(numpy=backend is not None):
+                    func()
+            finally:
+                compare.np = original
+    
+    def test_matches_reference(self):
+        """Statistics match a per-pixel reference across several strips"""
+        expected = reference_stats(self.img1, self.img2)
+        original_strip = compare.STRIP_PIXELS
+        compare.STRIP_PIXELS = 70 * 4
+        self.addCleanup(setattr, compare, "STRIP_PIXELS", original_strip)
+        
+        def check():
+            result = compare.compare_pixels(self.img1, self.img2)
+            self.assertFalse(result["identical"])
+            self.assertEqual(result["total_pixels"], 70 * 45)
+            for key in ("different_pixels", "max_abs_error"):
+                self.assertEqual(result[key], expected[key])
+            for key in ("mean_abs_error", "psnr"):
+                self.assertEqual(rounded(result[key]), rounded(expected[key]))
+            
+            # 70 px at 64 cells per side gives 2 px tiles
+            heatmap = result["heatmap"]
+            self.assertEqual(result["heatmap_tile"], 2)
+            self.assertEqual((len(heatmap[0]), len(heatmap)), (35, 23))
+            total = sum(
+                value * 3 * min(2, 45 - row * 2) * 2
+                for row, values in enumerate(heatmap) for value in values
+            )
+            self.assertAlmostEqual(total, sum(expected["mean_abs_error"]) * 70 * 45)
+        
+        self.run_both_backends(check)
+    
+    def test_identical_and_modes(self):
+        """Identical images report no error, whatever their mode"""
+        def check():
+            result = compare.compare_pixels(self.img1, self.img1.convert('RGBA'))
+            self.assertTrue(result["identical"])
+            self.assertEqual(result["similarity"], 100.0)
+            self.assertEqual(result["psnr"], math.inf)
+            self.assertEqual(result["max_abs_error"], [0, 0, 0])
+            self.assertEqual({v for row in result["heatmap"] for v in row}, {0})
+        
+        self.run_both_backends(check)
+        
+        with self.assertRaises(ValueError):
+            compare.compare_pixels(self.img1, self.img1.resize((10, 10)))
+    
+    def test_compare_images_files(self):
+        """compare_images reports the bulk statistics for files on disk"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path1 = os.path.join(tmp, "a.png")
+            path2 = os.path.join(tmp, "b.png")
+            self.img1.save(path1)
+            self.img2.save(path2)
+            
+            result = compare_images(path1, path2, verbose=False)
+            self.assertEqual(result["different_pixels"], reference_stats(self.img1, self.img2)["different_pixels"])
+            self.assertLess(result["psnr"], math.inf)
+            self.assertEqual(compare.render_heatmap(result["heatmap"], scale=2).size, (70, 46))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for containers of several named images
+"""
+
+import io
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import extract_image, extract_image_array, extract_preview, hide_image, hide_images, list_payloads
+from audio_steg.header import pack_index, parse_index, samples_needed
+from tests.test_engine import write_image, write_wav
+
+
+class TestContainer(unittest.TestCase):
+    """Test cases for hide_images and extraction by name"""
+    
+    def setUp(self):
+        """Create a carrier and a few small images of different sizes"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        
+        self.wav_path = self.path("carrier.wav")
+        write_wav(self.wav_path, 20000)
+        
+        self.images = []
+        for index, size in enumerate(((5, 4), (7, 3), (2, 9))):
+            path = self.path(f"asset{index}.png")
+            write_image(path, size, seed=index)
+            self.images.append(path)
+    
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+    
+    def pixels(self, path):
+        with Image.open(path) as img:
+            return img.convert('RGB').tobytes()
+    
+    def test_index_round_trip(self):
+        """Index entries survive packing and unpacking, names included"""
+        entries = [
+            {"name": "ä.png", "codec": 1, "width": 3, "height": 4, "offset": 0, "length": 10},
+            {"name": "b", "codec": 0, "width": 5, "height": 6, "offset": 10, "length": 90},
+        ]
+        parsed = parse_index(pack_index(entries), 2)
+        self.assertEqual(list(parsed), ["ä.png", "b"])
+        self.assertEqual(list(parsed.values()), entries)
+        
+        with self.assertRaises(ValueError):
+            parse_index(pack_index(entries)[:-1], 2)
+    
+    def test_round_trip(self):
+        """Every payload can be extracted by name, whatever the options"""
+        stego_path = self.path("stego.wav")
+        out_path = self.path("out.png")
+        
+        for bits_per_sample, compression in ((1, None), (3, "zlib"), (2, "original")):
+            with self.subTest(bits_per_sample=bits_per_sample, compression=compression):
+                result = hide_images(self.wav_path, self.images, stego_path, verbose=False,
+                                     bits_per_sample=bits_per_sample, compression=compression)
+                names = [os.path.basename(path) for path in self.images]
+                self.assertEqual([p["name"] for p in result["payloads"]], names)
+                self.assertEqual([p["name"] for p in list_payloads(stego_path)], names)
+                
+                for name, path in zip(names, self.images):
+                    extracted = extract_image(stego_path, out_path, verbose=False, name=name)
+                    self.assertEqual(extracted["name"], name)
+                    self.assertEqual(self.pixels(out_path), self.pixels(path))
+                    
+                    # Only the samples of the selected payload are read, plus
+                    # at most two leading bytes to reach a sample boundary
+                    n_samples = samples_needed(extracted["data_bytes"] + 2, bits_per_sample)
+                    self.assertLessEqual(extracted["metrics"]["phases"]["extract"]["bytes"], n_samples * 2)
+    
+    def test_sources_and_errors(self):
+        """Names come from dicts or pairs, and bad selections are reported"""
+        stego_path = self.path("stego.wav")
+        with open(self.images[1], 'rb') as f:
+            encoded = f.read()
+        hide_images(self.wav_path, {"one": self.images[0], "two": encoded}, stego_path, verbose=False)
+        
+        img = extract_image_array(stego_path, name="two")
+        self.assertEqual(img.tobytes(), self.pixels(self.images[1]))
+        
+        with self.assertRaisesRegex(ValueError, "No payload named"):
+            extract_image_array(stego_path, name="three")
+        with self.assertRaisesRegex(ValueError, "choose one by name"):
+            extract_image_array(stego_path)
+        with self.assertRaisesRegex(ValueError, "extract one by name"):
+            extract_preview(stego_path)
+        
+        # A container with one payload needs no name
+        hide_images(self.wav_path, [("only", self.images[2])], stego_path, verbose=False)
+        self.assertEqual(extract_image_array(stego_path).size, (2, 9))
+        
+        with self.assertRaisesRegex(ValueError, "unique"):
+            hide_images(self.wav_path, [("a", self.images[0]), ("a", self.images[1])], stego_path, verbose=False)
+        with self.assertRaisesRegex(ValueError, "need a name"):
+            hide_images(self.wav_path, [io.BytesIO(encoded)], stego_path, verbose=False)
+        with self.assertRaisesRegex(ValueError, "too large"):
+            hide_images(self.wav_path, [self.images[0], ("big", Image.new('RGB', (30, 30)))], stego_path,
+                        verbose=False)
+        with self.assertRaisesRegex(ValueError, "can be extracted"):
+            hide_images(self.wav_path, [("wide", Image.new('RGB', (10001, 1)))], stego_path, verbose=False,
+                        compression="zlib")
+        
+        # Single-image carriers still list and extract as before
+        hide_image(self.wav_path, self.images[0], stego_path, verbose=False)
+        self.assertEqual(list_payloads(stego_path)[0]["name"], None)
+        with self.assertRaisesRegex(ValueError, "not a container"):
+            extract_image_array(stego_path, name="asset0.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,443 @@
+"""
+Tests for the bulk LSB engine using synthetic carriers
+"""
+
+import io
+import sys
+import os
+import random
+import struct
+import tempfile
+import threading
+import unittest
+import wave
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import hide_image, extract_image, get_audio_capacity
+from audio_steg import hide_image_bytes, extract_image_array, extract_image_bytes, extract_region
+from audio_steg import extract_preview, OperationCancelled
+from audio_steg import engine
+from audio_steg.wavio import open_samples
+
+
+FORMATS = {1: "B", 2: "h", 4: "i"}
+
+
+def write_wav(path, n_frames, n_channels=1, sampwidth=2, seed=0):
+    """Write a WAV file filled with random samples"""
+    rng = random.Random(seed)
+    frames = bytes(rng.getrandbits(8) for _ in range(n_frames * n_channels * sampwidth))
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(n_channels)
+        wav.setsampwidth(sampwidth)
+        wav.setframerate(8000)
+        wav.writeframes(frames)
+
+
+def write_image(path, size, seed=0):
+    """Write a PNG filled with random RGB pixels"""
+    rng = random.Random(seed)
+    width, height = size
+    data = bytes(rng.getrandbits(8) for _ in range(width * height * 3))
+    Image.frombytes('RGB', size, data).save(path)
+
+
+def legacy_embed(frames, sampwidth, data):
+    """Reference implementation of the original per-bit embedding loop"""
+    fmt = f"{len(frames) // sampwidth}{FORMATS[sampwidth]}"
+    samples = list(struct.unpack(fmt, frames))
+    bit_index = 0
+    for byte in data:
+        for bit_position in range(8):
+            if (byte >> bit_position) & 1:
+                samples[bit_index] = samples[bit_index] | 1
+            else:
+                samples[bit_index] = samples[bit_index] & ~1
+            bit_index += 1
+    return struct.pack(fmt, *samples)
+
+
+def legacy_hide(wav_path, data, output_path):
+    """Reference implementation of the original in-memory hide pipeline"""
+    with wave.open(wav_path, 'rb') as wav:
+        params = wav.getparams()
+        frames = wav.readframes(params.nframes)
+    with wave.open(output_path, 'wb') as out:
+        out.setnchannels(params.nchannels)
+        out.setsampwidth(params.sampwidth)
+        out.setframerate(params.framerate)
+        out.writeframes(legacy_embed(frames, params.sampwidth, data))
+
+
+class TestEngine(unittest.TestCase):
+    """Test cases for the LSB engine"""
+
+    def setUp(self):
+        """Create a scratch directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def run_both_backends(self, func):
+        """Run ``func`` with NumPy (if available) and with the pure Python fallback"""
+        backends = [engine.np, None] if engine.np is not None else [None]
+        for backend in backends:
+            original = engine.np
+            engine.np = backend
+            try:
+                with self.subTest(numpy=backend is not None):
+                    func()
+            finally:
+                engine.np = original
+
+    def test_embed_matches_legacy(self):
+        """Bulk embedding is byte-identical to the per-bit loop"""
+        rng = random.Random(1)
+        data = bytes(rng.getrandbits(8) for _ in range(64))
+
+        def check():
+            for sampwidth in FORMATS:
+                frames = bytes(rng.getrandbits(8) for _ in range(600 * sampwidth))
+                buf = bytearray(frames)
+                engine.embed_bits(buf, sampwidth, data)
+                self.assertEqual(bytes(buf), legacy_embed(frames, sampwidth, data))
+
+        self.run_both_backends(check)
+
+    def test_extract_inverts_embed(self):
+        """Extraction returns exactly the embedded bytes at any offset"""
+        rng = random.Random(2)
+        data = bytes(rng.getrandbits(8) for _ in range(40))
+
+        def check():
+            for sampwidth in FORMATS:
+                buf = bytearray(rng.getrandbits(8) for _ in range(500 * sampwidth))
+                engine.embed_bits(buf, sampwidth, data, sample_offset=13)
+                self.assertEqual(engine.extract_bytes(buf, sampwidth, 40, sample_offset=13), data)
+
+        self.run_both_backends(check)
+
+    def test_multi_bit_round_trip(self):
+        """k-LSB embedding only touches the low k bits and extracts exactly"""
+        rng = random.Random(3)
+        data = bytes(rng.getrandbits(8) for _ in range(41))
+        
+        def check():
+            for bits_per_sample in (1, 2, 3, 4):
+                frames = bytes(rng.getrandbits(8) for _ in range(400 * 2))
+                buf = bytearray(frames)
+                engine.embed_bits(buf, 2, data, sample_offset=5, bits_per_sample=bits_per_sample)
+                mask = 0xFF ^ ((1 << bits_per_sample) - 1)
+                self.assertEqual(buf[1::2], frames[1::2])
+                self.assertEqual(bytes(b & mask for b in buf[::2]), bytes(b & mask for b in frames[::2]))
+                self.assertEqual(
+                    engine.extract_bytes(buf, 2, 41, sample_offset=5, bits_per_sample=bits_per_sample),
+                    data
+                )
+        
+        self.run_both_backends(check)
+    
+    def test_embed_not_enough_samples(self):
+        """Embedding more bits than samples raises ValueError"""
+        with self.assertRaises(ValueError):
+            engine.embed_bits(bytearray(10), 2, b"\x01")
+
+    def test_streaming_hide_matches_legacy(self):
+        """Chunked hide output is byte-identical to the in-memory pipeline"""
+        image_path = self.path("secret.png")
+        write_image(image_path, (5, 4))
+        with Image.open(image_path) as img:
+            data = struct.pack('<III', 5, 4, 60) + img.tobytes()
+
+        wav_path = self.path("carrier.wav")
+        write_wav(wav_path, 1500, 2, 2)
+
+        # Insert an extra chunk before the data chunk
+        with open(wav_path, 'rb') as f:
+            raw = f.read()
+        listed = raw[:36] + b'LIST' + struct.pack('<I', 3) + b'abc\x00' + raw[36:]
+        listed = listed[:4] + struct.pack('<I', len(listed) - 8) + listed[8:]
+        with open(wav_path, 'wb') as f:
+            f.write(listed)
+
+        expected_path = self.path("expected.wav")
+        legacy_hide(wav_path, data, expected_path)
+        with open(expected_path, 'rb') as f:
+            expected = f.read()
+
+        for chunk_size in (8, 30, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                stego_path = self.path("stego.wav")
+                hide_image(wav_path, image_path, stego_path, verbose=False, chunk_size=chunk_size)
+                with open(stego_path, 'rb') as f:
+                    self.assertEqual(f.read(), expected)
+
+    def test_hide_in_place(self):
+        """Hiding into the carrier's own path replaces it rather than truncating it"""
+        image_path = self.path("secret.png")
+        write_image(image_path, (5, 4))
+        wav_path = self.path("carrier.wav")
+        write_wav(wav_path, 1500)
+        
+        expected_path = self.path("expected.wav")
+        hide_image(wav_path, image_path, expected_path, verbose=False)
+        hide_image(wav_path, image_path, wav_path, verbose=False)
+        with open(wav_path, 'rb') as a, open(expected_path, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["carrier.wav", "expected.wav", "secret.png"])
+        
+        out_path = self.path("out.png")
+        extract_image(wav_path, out_path, verbose=False)
+        with Image.open(out_path) as a, Image.open(image_path) as b:
+            self.assertEqual(a.tobytes(), b.tobytes())
+
+    def test_sample_buffer_view(self):
+        """The mapped sample view matches the frames read by the wave module"""
+        wav_path = self.path("carrier.wav")
+        for sampwidth, fmt in FORMATS.items():
+            write_wav(wav_path, 300, 2, sampwidth)
+            with wave.open(wav_path, 'rb') as wav:
+                frames = wav.readframes(wav.getnframes())
+            with open_samples(wav_path) as carrier:
+                self.assertEqual(carrier.n_samples, 600)
+                self.assertEqual(bytes(carrier.data), frames)
+                samples = carrier.samples
+                self.assertEqual(samples.tolist(), list(struct.unpack(f"600{fmt}", frames)))
+                samples.release()
+
+    def test_bits_per_sample_hide(self):
+        """Images hidden with several bits per sample round-trip and raise capacity"""
+        image_path = self.path("secret.png")
+        write_image(image_path, (20, 20))
+        wav_path = self.path("carrier.wav")
+        write_wav(wav_path, 3000, 2, 2)
+        
+        one = get_audio_capacity(wav_path)["capacity_bytes"]
+        four = get_audio_capacity(wav_path, bits_per_sample=4)["capacity_bytes"]
+        self.assertEqual(four, (6000 - 160) * 4 // 8)
+        self.assertGreater(four, 3 * one)
+        
+        # 1200 bytes of pixels do not fit at one bit per sample
+        with self.assertRaises(ValueError):
+            hide_image(wav_path, image_path, self.path("stego.wav"), verbose=False)
+        
+        stego_path = self.path("stego.wav")
+        out_path = self.path("out.png")
+        hide_image(wav_path, image_path, stego_path, verbose=False, bits_per_sample=2, chunk_size=64)
+        result = extract_image(stego_path, out_path, verbose=False)
+        self.assertEqual(result["bits_per_sample"], 2)
+        with Image.open(image_path) as a, Image.open(out_path) as b:
+            self.assertEqual(a.tobytes(), b.tobytes())
+        
+        with self.assertRaises(ValueError):
+            hide_image(wav_path, image_path, stego_path, verbose=False, bits_per_sample=5)
+    
+    def test_compression_round_trip(self):
+        """Compressed payloads are smaller and extract transparently"""
+        image_path = self.path("secret.png")
+        Image.new('RGB', (40, 30), (200, 10, 10)).save(image_path)
+        jpeg_path = self.path("secret.jpg")
+        Image.new('RGB', (40, 30), (200, 10, 10)).save(jpeg_path)
+        wav_path = self.path("carrier.wav")
+        write_wav(wav_path, 12000, 1, 2)
+        stego_path = self.path("stego.wav")
+        out_path = self.path("out.png")
+        
+        for compression in ("zlib", "lzma", "original"):
+            with self.subTest(compression=compression):
+                source = jpeg_path if compression == "original" else image_path
+                result = hide_image(wav_path, source, stego_path, verbose=False, compression=compression)
+                self.assertLess(result["data_bytes"], 40 * 30 * 3)
+                if compression == "original":
+                    self.assertEqual(result["data_bytes"], os.path.getsize(jpeg_path))
+                
+                extracted = extract_image(stego_path, out_path, verbose=False)
+                self.assertEqual(extracted["compression"], compression)
+                with Image.open(source) as a, Image.open(out_path) as b:
+                    self.assertEqual(a.convert('RGB').tobytes(), b.tobytes())
+        
+        with self.assertRaises(ValueError):
+            hide_image(wav_path, image_path, stego_path, verbose=False, compression="bogus")
+        
+        # A wide image may compress small enough to fit, but could never be extracted
+        wide_path = self.path("wide.wav")
+        with self.assertRaisesRegex(ValueError, "can be extracted"):
+            hide_image(wav_path, Image.new('RGB', (12000, 50)), wide_path, verbose=False,
+                       bits_per_sample=4, compression="zlib")
+        self.assertFalse(os.path.exists(wide_path))
+        
+        # With auto_resize it is scaled down to the largest side extraction accepts
+        result = hide_image(wav_path, Image.new('RGB', (12000, 50)), wide_path, verbose=False, auto_resize=True,
+                            bits_per_sample=4, compression="zlib")
+        self.assertEqual(result["image_size"], (10000, 41))
+        self.assertEqual(extract_image(wide_path, out_path, verbose=False)["image_size"], (10000, 41))
+    
+    def test_round_trip(self):
+        """Hide and extract a random image in synthetic carriers"""
+        image_path = self.path("secret.png")
+        write_image(image_path, (9, 7))
+
+        def check():
+            for sampwidth in FORMATS:
+                for n_channels in (1, 2, 5):
+                    wav_path = self.path("carrier.wav")
+                    stego_path = self.path("stego.wav")
+                    out_path = self.path("out.png")
+                    write_wav(wav_path, 2000, n_channels, sampwidth)
+                    hide_image(wav_path, image_path, stego_path, verbose=False)
+                    result = extract_image(stego_path, out_path, verbose=False)
+                    self.assertEqual(result["image_size"], (9, 7))
+                    with Image.open(image_path) as a, Image.open(out_path) as b:
+                        self.assertEqual(a.tobytes(), b.tobytes())
+
+        self.run_both_backends(check)
+
+    def test_in_memory_round_trip(self):
+        """Bytes, file objects and images give the same output as paths"""
+        wav_path = self.path("carrier.wav")
+        image_path = self.path("secret.png")
+        stego_path = self.path("stego.wav")
+        write_wav(wav_path, 2000, 2)
+        write_image(image_path, (9, 7))
+        
+        hide_image(wav_path, image_path, stego_path, verbose=False)
+        with open(stego_path, 'rb') as f:
+            expected = f.read()
+        with open(wav_path, 'rb') as f:
+            wav_bytes = f.read()
+        with open(image_path, 'rb') as f:
+            image_bytes = f.read()
+        
+        with Image.open(image_path) as img:
+            for image in (image_bytes, io.BytesIO(image_bytes), img):
+                self.assertEqual(hide_image_bytes(wav_bytes, image), expected)
+        self.assertEqual(hide_image_bytes(bytearray(wav_bytes), image_bytes), expected)
+        
+        source = io.BytesIO(wav_bytes)
+        self.assertEqual(hide_image_bytes(source, image_bytes), expected)
+        source.write(b'x')  # the buffer export was released
+        
+        with open(wav_path, 'rb') as f:
+            self.assertEqual(hide_image_bytes(f, image_bytes), expected)
+        
+        img = extract_image_array(expected)
+        with Image.open(image_path) as original:
+            self.assertEqual((img.size, img.tobytes()), ((9, 7), original.tobytes()))
+        with Image.open(io.BytesIO(extract_image_bytes(io.BytesIO(expected)))) as out:
+            self.assertEqual(out.tobytes(), img.tobytes())
+
+
+    def test_extract_region(self):
+        """Regions read piecewise match crops of the full image"""
+        wav_path = self.path("carrier.wav")
+        image_path = self.path("secret.png")
+        stego_path = self.path("stego.wav")
+        write_wav(wav_path, 4000)
+        write_image(image_path, (13, 11))
+        
+        boxes = [(0, 0, 13, 11), (3, 2, 9, 7), (0, 4, 13, 6), (12, 10, 13, 11)]
+        with Image.open(image_path) as original:
+            for bits_per_sample in (1, 2, 3, 4):
+                for compression in (None, "zlib"):
+                    hide_image(wav_path, image_path, stego_path, verbose=False,
+                               bits_per_sample=bits_per_sample, compression=compression)
+                    for box in boxes:
+                        with self.subTest(k=bits_per_sample, compression=compression, box=box):
+                            region = extract_region(stego_path, box)
+                            self.assertEqual(region.tobytes(), original.crop(box).tobytes())
+        
+        with self.assertRaises(ValueError):
+            extract_region(stego_path, (0, 0, 14, 11))
+
+
+    def test_extract_preview(self):
+        """Previews sample every Nth pixel of the hidden image"""
+        wav_path = self.path("carrier.wav")
+        image_path = self.path("secret.png")
+        stego_path = self.path("stego.wav")
+        write_wav(wav_path, 12000)
+        write_image(image_path, (23, 17))
+        
+        with Image.open(image_path) as original:
+            pixels = original.load()
+            expected = Image.new('RGB', (8, 6))
+            expected.putdata([pixels[x, y] for y in range(0, 17, 3) for x in range(0, 23, 3)])
+        
+        def check():
+            for bits_per_sample in (1, 2, 3, 4):
+                hide_image(wav_path, image_path, stego_path, verbose=False, bits_per_sample=bits_per_sample)
+                preview = extract_preview(stego_path, max_side=8)
+                self.assertEqual(preview.tobytes(), expected.tobytes())
+        
+        self.run_both_backends(check)
+        
+        hide_image(wav_path, image_path, stego_path, verbose=False, compression="zlib")
+        self.assertEqual(extract_preview(stego_path, max_side=8).size, (8, 6))
+        
+        frames = bytes(range(256)) * 4
+        offsets = [0, 40, 301]
+        self.assertEqual(
+            engine.extract_runs(frames, 2, offsets, 1, bits_per_sample=3),
+            b''.join(engine.extract_bytes(frames, 2, 1, offset, 3) for offset in offsets)
+        )
+
+
+    def test_metrics(self):
+        """Results report per-phase metrics and pass them to the callback"""
+        wav_path = self.path("carrier.wav")
+        image_path = self.path("secret.png")
+        stego_path = self.path("stego.wav")
+        write_wav(wav_path, 2000)
+        write_image(image_path, (9, 7))
+        
+        reports = []
+        result = hide_image(wav_path, image_path, stego_path, verbose=False, metrics_callback=reports.append)
+        self.assertEqual(reports, [result["metrics"]])
+        phases = result["metrics"]["phases"]
+        self.assertEqual(set(phases), {"read", "image_load", "encode", "embed", "write"})
+        self.assertEqual(phases["write"]["bytes"], os.path.getsize(stego_path))
+        self.assertEqual(phases["image_load"]["bytes"], 9 * 7 * 3)
+        
+        result = extract_image(stego_path, self.path("out.png"), verbose=False)
+        self.assertEqual(result["metrics"]["operation"], "extract")
+        self.assertEqual(set(result["metrics"]["phases"]), {"read", "extract", "decode", "save"})
+        self.assertTrue(all(phase["seconds"] >= 0 for phase in result["metrics"]["phases"].values()))
+
+    def test_progress_and_cancel(self):
+        """Progress reaches the total and a set cancel token stops the operation"""
+        wav_path = self.path("carrier.wav")
+        image_path = self.path("secret.png")
+        stego_path = self.path("stego.wav")
+        write_wav(wav_path, 2000)
+        write_image(image_path, (9, 7))
+        
+        calls = []
+        hide_image(wav_path, image_path, stego_path, verbose=False, chunk_size=256,
+                   progress=lambda done, total: calls.append((done, total)))
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(calls[-1], (2000 * 2, 2000 * 2))
+        self.assertEqual([done for done, _ in calls], sorted(done for done, _ in calls))
+        
+        calls = []
+        extract_image(stego_path, self.path("out.png"), verbose=False,
+                      progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(calls[-1], (9 * 7 * 3, 9 * 7 * 3))
+        
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(OperationCancelled):
+            hide_image(wav_path, image_path, self.path("cancelled.wav"), verbose=False, cancel=cancel)
+        self.assertFalse(os.path.exists(self.path("cancelled.wav")))
+        with self.assertRaises(OperationCancelled):
+            extract_image(stego_path, self.path("cancelled.png"), verbose=False, cancel=cancel)
+        self.assertFalse(os.path.exists(self.path("cancelled.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for lazy loading of the package and the CLI
+"""
+
+import subprocess
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_steg
+from tests.test_engine import write_wav
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the CLI in a fresh interpreter and prints the heavy modules it loaded
+CLI_PROBE = """
+import sys
+sys.argv = ["steg"] + sys.argv[1:]
+sys.path.insert(0, "cli")
+import steg
+steg.main()
+print(sorted(name for name in ("PIL", "numpy") if name in sys.modules))
+"""
+
+
+def loaded_modules(*argv):
+    """Heavy modules loaded by a CLI command run in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", CLI_PROBE] + list(argv), cwd=ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, universal_newlines=True
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+class TestImports(unittest.TestCase):
+    """Test cases for deferred imports"""
+    
+    def test_package_attributes(self):
+        """Public names resolve on first access and are listed by dir()"""
+        for name in audio_steg.__all__:
+            self.assertTrue(callable(getattr(audio_steg, name)))
+            self.assertIn(name, dir(audio_steg))
+        with self.assertRaises(AttributeError):
+            audio_steg.no_such_function
+    
+    def test_submodule_attributes(self):
+        """Submodules resolve as attributes after a bare import"""
+        probe = "import audio_steg; print(audio_steg.core.hide_image.__name__, audio_steg.utils.plan_resize.__name__)"
+        output = subprocess.run(
+            [sys.executable, "-c", probe], cwd=ROOT,
+            stdout=subprocess.PIPE, check=True, universal_newlines=True
+        ).stdout
+        self.assertEqual(output.split(), ["hide_image", "plan_resize"])
+    
+    def test_light_commands_skip_pillow(self):
+        """capacity and scan start without loading Pillow"""
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = os.path.join(tmp, "carrier.wav")
+            write_wav(wav_path, 100)
+            
+            self.assertEqual(loaded_modules("capacity", wav_path), "[]")
+            self.assertNotIn("PIL", loaded_modules("scan", tmp))
+            self.assertIn("PIL", loaded_modules("compare", wav_path, wav_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
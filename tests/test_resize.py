@@ -0,0 +1,107 @@
+"""
+Tests for the resize planner and auto-resizing
+"""
+
+import random
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import extract_image, hide_image, resize_image_for_audio
+from audio_steg.utils import plan_resize
+from tests.test_engine import write_wav
+
+
+def best_fit(width, height, max_pixels):
+    """Largest floor-scaled dimensions fitting ``max_pixels``, by exhaustive search"""
+    candidates = [(w, height * w // width) for w in range(1, width + 1)]
+    candidates += [(width * h // height, h) for h in range(1, height + 1)]
+    fitting = [(w * h, (w, h)) for w, h in candidates if w >= 1 and h >= 1 and w * h <= max_pixels]
+    return max(fitting)[1] if fitting else None
+
+
+class TestResize(unittest.TestCase):
+    """Test cases for plan_resize and auto_resize"""
+    
+    def setUp(self):
+        """Create a scratch directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+    
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+    
+    def test_plan_is_largest_fit(self):
+        """Planned sizes fit the budget and match an exhaustive search"""
+        rng = random.Random(5)
+        for _ in range(300):
+            width, height = rng.randint(1, 120), rng.randint(1, 120)
+            max_pixels = rng.randint(1, width * height)
+            planned = plan_resize((width, height), max_pixels * 3)
+            self.assertLessEqual(planned[0] * planned[1], max_pixels)
+            
+            expected = best_fit(width, height, max_pixels)
+            if expected is not None:
+                self.assertEqual(planned[0] * planned[1], expected[0] * expected[1])
+    
+    def test_plan_options(self):
+        """Extreme aspect ratios, relaxed aspect and compression ratios"""
+        self.assertEqual(plan_resize((100000, 1), 300), (100, 1))
+        self.assertEqual(plan_resize((2, 50000), 30), (1, 10))
+        self.assertEqual(plan_resize((640, 480), 640 * 480 * 3), (640, 480))
+        self.assertEqual(plan_resize((12000, 50), 12000 * 50 * 3, max_side=10000), (10000, 41))
+        self.assertEqual(plan_resize((3, 20000), 300, max_side=10000), (1, 100))
+        
+        # Relaxing the aspect ratio widens the image to fill more of the budget
+        self.assertEqual(plan_resize((300, 200), 10000 * 3), (122, 81))
+        self.assertEqual(plan_resize((300, 200), 10000 * 3, keep_aspect=False), (123, 81))
+        self.assertEqual(plan_resize((1000, 1000), 3 * 250000, compression_ratio=0.25), (1000, 1000))
+        self.assertEqual(plan_resize((1000, 1000), 3 * 250000, compression_ratio=1.0), (500, 500))
+        
+        with self.assertRaises(ValueError):
+            plan_resize((10, 10), 2)
+    
+    def test_auto_resize_jpeg(self):
+        """Oversized JPEGs are scaled down on decode and still round-trip"""
+        rng = random.Random(6)
+        image_path = self.path("photo.jpg")
+        Image.frombytes('RGB', (400, 300), bytes(rng.getrandbits(8) for _ in range(400 * 300 * 3))).save(image_path)
+        
+        wav_path = self.path("carrier.wav")
+        stego_path = self.path("stego.wav")
+        out_path = self.path("out.png")
+        write_wav(wav_path, 20000)
+        
+        for compression in (None, "zlib"):
+            with self.subTest(compression=compression):
+                result = hide_image(wav_path, image_path, stego_path, verbose=False, auto_resize=True,
+                                    compression=compression)
+                width, height = result["image_size"]
+                self.assertLessEqual(width * height * 3, 20000 // 8)
+                self.assertAlmostEqual(width / height, 4 / 3, delta=0.15)
+                
+                extracted = extract_image(stego_path, out_path, verbose=False)
+                self.assertEqual(extracted["image_size"], (width, height))
+        
+        # Images passed in are resized without being changed themselves
+        with Image.open(image_path) as img:
+            result = hide_image(wav_path, img, stego_path, verbose=False, auto_resize=True)
+            self.assertEqual(img.size, (400, 300))
+        self.assertEqual(extract_image(stego_path, out_path, verbose=False)["image_size"], result["image_size"])
+        
+        resized_path = self.path("resized.png")
+        info = resize_image_for_audio(image_path, resized_path, wav_path=wav_path, verbose=False)
+        self.assertTrue(info["resized"])
+        with Image.open(resized_path) as img:
+            self.assertEqual(img.size, info["final_size"])
+            self.assertEqual(img.mode, 'RGB')
+
+
+if __name__ == "__main__":
+    unittest.main()
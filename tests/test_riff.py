@@ -0,0 +1,128 @@
+"""
+Tests for the RIFF/WAVE reader and writer
+"""
+
+import io
+import sys
+import os
+import random
+import struct
+import tempfile
+import unittest
+import wave
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import hide_image, extract_image
+from audio_steg.riff import (
+    GUID_SUFFIX, WAVE_FORMAT_EXTENSIBLE, WAVE_FORMAT_IEEE_FLOAT, read_wav_info, write_wav_header
+)
+from tests.test_engine import write_image, write_wav
+
+
+def extensible_fmt(n_channels, framerate, sampwidth, format_tag):
+    """Build a WAVE_FORMAT_EXTENSIBLE fmt chunk payload"""
+    block_align = n_channels * sampwidth
+    return struct.pack(
+        '<HHIIHHHHI16s', WAVE_FORMAT_EXTENSIBLE, n_channels, framerate,
+        framerate * block_align, block_align, sampwidth * 8,
+        22, sampwidth * 8, 0x3, struct.pack('<H', format_tag) + GUID_SUFFIX
+    )
+
+
+def write_float_wav(path, n_frames, n_channels=2, rf64=False, seed=0):
+    """Write an EXTENSIBLE 32-bit float WAV file with random samples"""
+    rng = random.Random(seed)
+    samples = [rng.uniform(-1, 1) for _ in range(n_frames * n_channels)]
+    data = struct.pack(f'<{len(samples)}f', *samples)
+    fmt = extensible_fmt(n_channels, 48000, 4, WAVE_FORMAT_IEEE_FLOAT)
+    with open(path, 'wb') as f:
+        write_wav_header(f, n_channels, 4, 48000, len(data), fmt_chunk=fmt, rf64=rf64)
+        f.write(data)
+
+
+class TestRiff(unittest.TestCase):
+    """Test cases for the RIFF reader and writer"""
+    
+    def setUp(self):
+        """Create a scratch directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+    
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+    
+    def test_pcm_header_matches_wave(self):
+        """Plain PCM headers are byte-identical to the wave module's"""
+        for sampwidth in (1, 2, 3, 4):
+            wav_path = self.path("carrier.wav")
+            write_wav(wav_path, 10, 2, sampwidth)
+            with open(wav_path, 'rb') as f:
+                expected = f.read(44)
+            
+            buf = io.BytesIO()
+            write_wav_header(buf, 2, sampwidth, 8000, 20 * sampwidth)
+            self.assertEqual(buf.getvalue(), expected)
+    
+    def test_read_float_rf64(self):
+        """EXTENSIBLE float headers and RF64 sizes are decoded"""
+        wav_path = self.path("float.wav")
+        write_float_wav(wav_path, 100, rf64=True)
+        
+        with open(wav_path, 'rb') as f:
+            self.assertEqual(f.read(4), b'RF64')
+            info = read_wav_info(f)
+        
+        self.assertTrue(info["rf64"])
+        self.assertEqual(info["encoding"], "float")
+        self.assertEqual((info["n_channels"], info["sampwidth"], info["n_frames"]), (2, 4, 100))
+        self.assertEqual(info["data_offset"] + info["data_size"], os.path.getsize(wav_path))
+    
+    def test_unsupported_format(self):
+        """Formats the engine cannot embed into are rejected"""
+        buf = io.BytesIO()
+        fmt = struct.pack('<HHIIHH', 0x0011, 1, 8000, 4000, 256, 4)  # IMA ADPCM
+        write_wav_header(buf, 1, 1, 8000, 0, fmt_chunk=fmt + b'\x00\x00')
+        with self.assertRaises(ValueError):
+            read_wav_info(buf)
+    
+    def test_round_trip_native_formats(self):
+        """Images round-trip through 24-bit, float and RF64 carriers unconverted"""
+        image_path = self.path("secret.png")
+        out_path = self.path("out.png")
+        stego_path = self.path("stego.wav")
+        write_image(image_path, (9, 7))
+        
+        pcm24_path = self.path("pcm24.wav")
+        write_wav(pcm24_path, 2000, 2, 3)
+        float_path = self.path("float.wav")
+        write_float_wav(float_path, 2000)
+        rf64_path = self.path("rf64.wav")
+        write_float_wav(rf64_path, 2000, rf64=True)
+        
+        for wav_path in (pcm24_path, float_path, rf64_path):
+            with self.subTest(wav_path=os.path.basename(wav_path)):
+                hide_image(wav_path, image_path, stego_path, verbose=False, bits_per_sample=2)
+                
+                with open(wav_path, 'rb') as f:
+                    source = read_wav_info(f)
+                with open(stego_path, 'rb') as f:
+                    stego = read_wav_info(f)
+                for key in ("fmt_chunk", "rf64", "data_size"):
+                    self.assertEqual(stego[key], source[key])
+                
+                extract_image(stego_path, out_path, verbose=False)
+                with Image.open(image_path) as a, Image.open(out_path) as b:
+                    self.assertEqual(a.tobytes(), b.tobytes())
+        
+        # 24-bit output is still readable by the standard library
+        hide_image(pcm24_path, image_path, stego_path, verbose=False)
+        with wave.open(stego_path, 'rb') as wav:
+            self.assertEqual((wav.getsampwidth(), wav.getnframes()), (3, 2000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Tests for payload detection
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_steg import hide_image, scan_directory
+from tests.test_engine import write_image, write_wav
+
+
+class TestScan(unittest.TestCase):
+    """Test cases for scanning directories"""
+    
+    def test_scan_directory(self):
+        """Only files with a valid payload header are reported"""
+        with tempfile.TemporaryDirectory() as tmp:
+            sub = os.path.join(tmp, "sub")
+            os.mkdir(sub)
+            image_path = os.path.join(tmp, "secret.png")
+            write_image(image_path, (6, 4))
+            
+            write_wav(os.path.join(tmp, "clean.wav"), 2000)
+            hide_image(os.path.join(tmp, "clean.wav"), image_path, os.path.join(tmp, "a.wav"), verbose=False)
+            hide_image(os.path.join(tmp, "clean.wav"), image_path, os.path.join(sub, "b.wav"),
+                       verbose=False, bits_per_sample=2, compression="zlib")
+            with open(os.path.join(tmp, "broken.wav"), "wb") as f:
+                f.write(b"not a wav file")
+            
+            flat = {os.path.basename(r["path"]): r for r in scan_directory(tmp)}
+            self.assertEqual(sorted(flat), ["a.wav", "broken.wav", "clean.wav"])
+            self.assertTrue(flat["a.wav"]["has_payload"])
+            self.assertEqual(flat["a.wav"]["image_size"], (6, 4))
+            self.assertFalse(flat["clean.wav"]["has_payload"])
+            self.assertFalse(flat["broken.wav"]["has_payload"])
+            
+            deep = {os.path.basename(r["path"]): r for r in scan_directory(tmp, recursive=True)}
+            self.assertEqual(deep["b.wav"]["bits_per_sample"], 2)
+            self.assertEqual(deep["b.wav"]["compression"], "zlib")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for the local HTTP daemon
+"""
+
+import http.client
+import io
+import json
+import sys
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import get_audio_capacity
+from audio_steg.server import create_server
+from tests.test_engine import write_image, write_wav
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket"""
+    
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.socket_path = path
+    
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestServer(unittest.TestCase):
+    """Test cases for the HTTP daemon"""
+    
+    def setUp(self):
+        """Create inputs and start a daemon on a free port"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.wav_path = self.path("carrier.wav")
+        self.image_path = self.path("secret.png")
+        write_wav(self.wav_path, 2000)
+        write_image(self.image_path, (9, 7))
+        
+        self.server = self.start(create_server(port=0, workers=0, quiet=True))
+        self.conn = http.client.HTTPConnection(*self.server.server_address)
+        self.addCleanup(self.conn.close)
+    
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+    
+    def start(self, server):
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+    
+    def request(self, conn, method, url, body=None, headers=None):
+        conn.request(method, url, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read()
+    
+    def post_json(self, conn, url, payload):
+        status, _, body = self.request(conn, "POST", url, json.dumps(payload),
+                                       {"Content-Type": "application/json"})
+        return status, json.loads(body)
+    
+    def test_path_requests(self):
+        """JSON requests name files on disk and return the result dicts"""
+        stego_path = self.path("stego.wav")
+        out_path = self.path("out.png")
+        
+        status, result = self.post_json(self.conn, "/hide?bits_per_sample=2",
+                                        {"audio": self.wav_path, "image": self.image_path, "output": stego_path})
+        self.assertEqual(status, 200)
+        self.assertEqual(result["bits_per_sample"], 2)
+        
+        status, result = self.post_json(self.conn, "/extract", {"audio": stego_path, "output": out_path})
+        self.assertEqual((status, result["image_size"]), (200, [9, 7]))
+        with Image.open(self.image_path) as a, Image.open(out_path) as b:
+            self.assertEqual(a.tobytes(), b.tobytes())
+        
+        status, result = self.post_json(self.conn, "/capacity", {"audio": self.wav_path})
+        self.assertEqual(result, get_audio_capacity(self.wav_path))
+        
+        status, results = self.post_json(self.conn, "/scan", {"directory": self.tmp.name})
+        payloads = {os.path.basename(r["path"]): r["has_payload"] for r in results}
+        self.assertEqual(payloads, {"carrier.wav": False, "stego.wav": True})
+        
+        status, result = self.post_json(self.conn, "/capacity", {"audio": self.path("missing.wav")})
+        self.assertEqual(status, 404)
+        status, result = self.post_json(self.conn, "/hide", {"audio": self.wav_path})
+        self.assertEqual(status, 400)
+        self.assertIn("error", result)
+    
+    def test_body_requests(self):
+        """File contents posted in the body are processed in memory"""
+        with open(self.wav_path, 'rb') as f:
+            wav_bytes = f.read()
+        with open(self.image_path, 'rb') as f:
+            image_bytes = f.read()
+        
+        boundary = "steg-test-boundary"
+        body = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode() + data + b"\r\n"
+            for name, data in (("audio", wav_bytes), ("image", image_bytes))
+        ) + f"--{boundary}--\r\n".encode()
+        
+        status, content_type, stego = self.request(
+            self.conn, "POST", "/hide", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+        self.assertEqual((status, content_type), (200, "audio/wav"))
+        self.assertEqual(len(stego), len(wav_bytes))
+        
+        status, content_type, png = self.request(self.conn, "POST", "/extract", stego)
+        self.assertEqual((status, content_type), (200, "image/png"))
+        with Image.open(io.BytesIO(png)) as out, Image.open(self.image_path) as expected:
+            self.assertEqual(out.tobytes(), expected.tobytes())
+        
+        status, _, capacity = self.request(self.conn, "POST", "/capacity?bits_per_sample=2", wav_bytes)
+        self.assertEqual(json.loads(capacity), get_audio_capacity(self.wav_path, bits_per_sample=2))
+    
+    def test_unix_socket_with_workers(self):
+        """A daemon with a worker pool answers on a Unix socket"""
+        socket_path = self.path("steg.sock")
+        server = self.start(create_server(socket_path=socket_path, workers=1, quiet=True))
+        self.addCleanup(server.executor.shutdown)
+        
+        conn = UnixHTTPConnection(socket_path)
+        self.addCleanup(conn.close)
+        status, _, body = self.request(conn, "GET", "/health")
+        self.assertEqual((status, json.loads(body)["status"]), (200, "ok"))
+        
+        status, result = self.post_json(conn, "/hide", {
+            "audio": self.wav_path, "image": self.image_path, "output": self.path("stego.wav")
+        })
+        self.assertEqual((status, result["success"]), (200, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
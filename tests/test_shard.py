@@ -0,0 +1,117 @@
+"""
+Tests for hiding one image across several carriers
+"""
+
+import shutil
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from audio_steg import extract_image, extract_image_sharded, hide_image_sharded, scan_directory
+from audio_steg.header import pack_header, parse_header
+from audio_steg.shard import plan_shards
+from tests.test_engine import write_image, write_wav
+
+
+class TestShard(unittest.TestCase):
+    """Test cases for sharded hide and extract"""
+    
+    def setUp(self):
+        """Create three carriers of different lengths and an image none of them can hold alone"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        
+        self.carriers = []
+        for index, n_frames in enumerate((3000, 5000, 4000)):
+            path = self.path(f"carrier{index}.wav")
+            write_wav(path, n_frames, seed=index)
+            self.carriers.append(path)
+        
+        self.image_path = self.path("secret.png")
+        write_image(self.image_path, (20, 18))
+        
+        os.mkdir(self.path("shards"))
+        self.outputs = [self.path("shards", f"part{index}.wav") for index in range(3)]
+    
+    def path(self, *names):
+        return os.path.join(self.tmp.name, *names)
+    
+    def test_plan_shards(self):
+        """Shards are proportional to capacity and always fit"""
+        self.assertEqual(plan_shards(100, [100, 100]), [50, 50])
+        self.assertEqual(plan_shards(10, [1, 2, 7]), [1, 2, 7])
+        self.assertEqual(sum(plan_shards(997, [300, 500, 400])), 997)
+        
+        with self.assertRaises(ValueError):
+            plan_shards(11, [5, 5])
+        with self.assertRaises(ValueError):
+            plan_shards(1, [5, 5])
+        with self.assertRaisesRegex(ValueError, "Carrier\\(s\\) 2 of 2 too short"):
+            plan_shards(100, [100, 0])
+    
+    def test_header_round_trip(self):
+        """Shard fields survive packing and unpacking"""
+        shard = {"payload_id": b"\x01" * 8, "index": 2, "count": 5, "total_size": 999}
+        header = parse_header(pack_header(3, 4, 100, 2, 1, shard=shard))
+        self.assertEqual(header["shard"], {"payload_id": "01" * 8, "index": 2, "count": 5, "total_size": 999})
+        self.assertEqual(header["header_size"], 36)
+        self.assertIsNone(parse_header(pack_header(3, 4, 100, 2, 1))["shard"])
+    
+    def test_round_trip(self):
+        """Shards reassemble from a list in any order or from a directory"""
+        for compression, workers in ((None, 1), ("zlib", 2)):
+            with self.subTest(compression=compression):
+                result = hide_image_sharded(self.carriers, self.image_path, self.outputs, verbose=False,
+                                            compression=compression, workers=workers)
+                self.assertEqual(len(result["shards"]), 3)
+                self.assertEqual(sum(s["data_bytes"] for s in result["shards"]), result["data_bytes"])
+                
+                out_path = self.path("out.png")
+                extracted = extract_image_sharded(list(reversed(self.outputs)), out_path, verbose=False,
+                                                  workers=workers)
+                self.assertEqual(extracted["payload_id"], result["payload_id"])
+                self.assertEqual(extracted["shards"], self.outputs)
+                with Image.open(out_path) as a, Image.open(self.image_path) as b:
+                    self.assertEqual(a.tobytes(), b.convert('RGB').tobytes())
+                
+                extracted = extract_image_sharded(self.path("shards"), out_path, verbose=False, workers=1)
+                self.assertEqual(extracted["image_size"], (20, 18))
+    
+    def test_errors(self):
+        """Missing, mixed and single shards are reported"""
+        result = hide_image_sharded(self.carriers, self.image_path, self.outputs, verbose=False, workers=1)
+        
+        with self.assertRaisesRegex(ValueError, "Missing shard"):
+            extract_image_sharded(self.outputs[:2], self.path("out.png"), verbose=False)
+        with self.assertRaisesRegex(ValueError, "shard 1 of 3"):
+            extract_image(self.outputs[0], self.path("out.png"), verbose=False)
+        with self.assertRaisesRegex(ValueError, "too large"):
+            hide_image_sharded(self.carriers[:1], self.image_path, self.outputs[:1], verbose=False)
+        with self.assertRaisesRegex(ValueError, "can be extracted"):
+            hide_image_sharded(self.carriers, Image.new('RGB', (10001, 2)), self.outputs, verbose=False)
+        
+        # A second payload in the same directory must be chosen by ID
+        os.mkdir(self.path("other"))
+        others = [self.path("other", f"part{index}.wav") for index in range(3)]
+        hide_image_sharded(self.carriers, self.image_path, others, verbose=False, workers=1)
+        for path in others:
+            shutil.copy(path, self.path("shards", "other-" + os.path.basename(path)))
+        
+        with self.assertRaisesRegex(ValueError, "several payloads"):
+            extract_image_sharded(self.path("shards"), self.path("out.png"), verbose=False)
+        extracted = extract_image_sharded(self.path("shards"), self.path("out.png"), verbose=False,
+                                          payload_id=result["payload_id"], workers=1)
+        self.assertEqual(extracted["shards"], self.outputs)
+        
+        shards = [r["shard"] for r in scan_directory(self.path("shards")) if r["has_payload"]]
+        self.assertEqual(len(shards), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()